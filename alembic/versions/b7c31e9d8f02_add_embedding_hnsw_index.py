@@ -0,0 +1,33 @@
+"""add_embedding_hnsw_index
+
+Revision ID: b7c31e9d8f02
+Revises: 0cd94ce50f5b
+Create Date: 2026-08-29 10:41:55.318264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c31e9d8f02'
+down_revision: Union[str, Sequence[str], None] = '0cd94ce50f5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ANN index for semantic search: without it pgvector sequential-scans
+    # all messages and recomputes cosine distance per row.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_embedding_hnsw "
+        "ON messages USING hnsw (embedding vector_cosine_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_messages_embedding_hnsw")
@@ -0,0 +1,36 @@
+"""add_next_seq_id_counter
+
+Revision ID: c4d82a61f7b9
+Revises: b7c31e9d8f02
+Create Date: 2026-08-29 11:02:37.584912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d82a61f7b9'
+down_revision: Union[str, Sequence[str], None] = 'b7c31e9d8f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'conversations',
+        sa.Column('next_seq_id', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Seed the counter from existing messages so new inserts continue the sequence.
+    op.execute(
+        "UPDATE conversations c SET next_seq_id = COALESCE("
+        "(SELECT max(sequence_number) FROM messages m WHERE m.conversation_id = c.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversations', 'next_seq_id')
@@ -0,0 +1,35 @@
+"""add_message_window_index
+
+Revision ID: e91f5c3ab2d4
+Revises: c4d82a61f7b9
+Create Date: 2026-08-29 11:14:21.773046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91f5c3ab2d4'
+down_revision: Union[str, Sequence[str], None] = 'c4d82a61f7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Composite index matching the sliding-window query
+    # (WHERE conversation_id = ... ORDER BY sequence_number DESC LIMIT n)
+    # so Postgres walks the index tail instead of sorting.
+    op.create_index(
+        'ix_msg_conv_seq',
+        'messages',
+        ['conversation_id', sa.text('sequence_number DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_msg_conv_seq', table_name='messages')
@@ -118,7 +118,11 @@ export default function Home() {
                     attachments: pendingAttachments.map(att => ({
                         id: att.id,
                         type: att.type,
-                        base64_data: (att as any).base64_data
+                        base64_data: (att as any).base64_data,
+                        mime_type: (att as any).mime_type,
+                        // Large images skip inline base64; the server reads
+                        // the stored file back via this path instead
+                        url: (att as any).file_path
                     }))
                 }],
                 conversation_id: conversationId,
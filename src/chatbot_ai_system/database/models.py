@@ -41,6 +41,10 @@ class Conversation(Base):
     summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     last_summarized_seq_id: Mapped[int] = mapped_column(Integer, default=0)
 
+    # Monotonic message counter, bumped atomically by add_message so callers
+    # don't need a SELECT max(sequence_number) round trip before inserting.
+    next_seq_id: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     user: Mapped["User"] = relationship(back_populates="conversations")
     messages: Mapped[List["Message"]] = relationship(
         back_populates="conversation", order_by="Message.sequence_number"
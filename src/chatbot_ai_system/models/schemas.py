@@ -23,7 +23,7 @@ class ToolCallFunction(BaseModel):
 
 
 class ToolCall(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     function: ToolCallFunction
     type: str = "function"
 
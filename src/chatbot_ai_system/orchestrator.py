@@ -11,7 +11,9 @@ Phase 5.5: Adds agentic orchestration for complex multi-step tasks.
 - COMPLEX queries → Plan + ReAct agentic loop
 """
 
+import asyncio
 import logging
+import time
 import uuid
 from typing import Any, AsyncGenerator, Dict, List, Optional
 from uuid import UUID
@@ -33,10 +35,74 @@ from chatbot_ai_system.observability.metrics import (
 from chatbot_ai_system.providers.base import BaseLLMProvider
 from chatbot_ai_system.services.agentic_engine import AgenticEngine
 from chatbot_ai_system.services.embedding import EmbeddingService
+from chatbot_ai_system.services.media_pipeline import MediaPipeline
 from chatbot_ai_system.tools.registry import ToolRegistry
 
 logger = logging.getLogger(__name__)
 
+# Lazy singleton, mirroring the one in multimodal_routes — only needed to
+# rehydrate large images that skipped inline base64 in the upload response
+_media_pipeline: Optional[MediaPipeline] = None
+
+
+def _get_media_pipeline() -> MediaPipeline:
+    global _media_pipeline
+    if _media_pipeline is None:
+        _media_pipeline = MediaPipeline()
+    return _media_pipeline
+
+
+# Rough prompt budget in tokens (~4 chars/token for English text). An exact
+# tokenizer would add a dependency and per-turn cost for little gain here.
+_CONTEXT_TOKEN_BUDGET = 4096
+
+# The static parts of the system prompt never change between requests, so
+# assemble them once at import time; per-request context (user profile,
+# semantic context, summary) is appended on top of these.
+_NO_TOOL_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant."
+    "\nAnswer using your internal knowledge. Do not hallucinate or fabricate tool calls."
+)
+
+_TOOL_USE_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant."
+    "\nYou have access to external tools via MCP.\n"
+    "1. If the user's request requires it, call the appropriate tool.\n"
+    "2. Output a valid JSON tool call.\n"
+    "3. Use the tool result to answer the question."
+)
+
+
+def _context_window(
+    messages: List[ChatMessage], max_tokens: int = _CONTEXT_TOKEN_BUDGET
+) -> List[ChatMessage]:
+    """Trim *messages* to a token budget, always keeping the system prompt.
+
+    Walks backwards from the newest message so the model sees the most
+    recent exchange; older turns are covered by the rolling summary that
+    is injected into the system prompt. Orphaned tool results (whose
+    originating assistant message fell outside the window) are dropped
+    to keep the prompt well-formed.
+    """
+    if not messages:
+        return messages
+
+    head = [messages[0]] if messages[0].role == MessageRole.SYSTEM else []
+    budget = max_tokens - sum(len(m.content or "") for m in head) // 4
+
+    kept: List[ChatMessage] = []
+    for msg in reversed(messages[len(head) :]):
+        budget -= len(msg.content or "") // 4 + 4
+        if budget < 0 and kept:
+            break
+        kept.append(msg)
+    kept.reverse()
+
+    while kept and kept[0].role == MessageRole.TOOL:
+        kept.pop(0)
+
+    return head + kept
+
 
 class ChatOrchestrator:
     """
@@ -74,8 +140,6 @@ class ChatOrchestrator:
         Main entry point for the orchestrator (Phase 3).
         Supports multimodal input (Phase 5.0).
         """
-        import time
-
         start_time = time.time()
 
         conv_uuid = uuid.UUID(conversation_id)
@@ -88,8 +152,13 @@ class ChatOrchestrator:
 
         if last_user_msg and last_user_msg.attachments:
             for att in last_user_msg.attachments:
-                if att.type == "image" and att.base64_data:
-                    has_images = True
+                if att.type == "image":
+                    if not att.base64_data and att.url:
+                        # Large uploads skip inline base64 — read the stored
+                        # file back so the vision call still sees the image
+                        att.base64_data = await _get_media_pipeline().load_image_base64(att.url)
+                    if att.base64_data:
+                        has_images = True
                 if att.type in ("audio", "video") and att.transcription:
                     has_audio_transcription = True
                     # Inject transcription into the message content
@@ -109,8 +178,9 @@ class ChatOrchestrator:
             original_model = model
             model = settings.vision_model
             logger.info(
-                f"Phase 5.0: Detected image attachments — switching model "
-                f"from {original_model} to {model}"
+                "Phase 5.0: Detected image attachments — switching model from %s to %s",
+                original_model,
+                model,
             )
 
         # Fetch Long-Term Memory (Phase 2 Addition)
@@ -141,7 +211,7 @@ class ChatOrchestrator:
         cached_context = await redis_client.get(context_cache_key)
 
         if cached_context:
-            logger.info(f"Using cached context for conversation {conversation_id}")
+            logger.info("Using cached context for conversation %s", conversation_id)
             # cached_context is a dict containing user_context, semantic_context, and conv_summary
             if not user_context:
                 user_context = cached_context.get("user_context", "")
@@ -154,10 +224,19 @@ class ChatOrchestrator:
             pass
 
         # --- Phase 4+5.5: Intent + Complexity Classification ---
+        # The query embedding for semantic retrieval depends only on
+        # user_input, so kick it off now and let it overlap the
+        # classification round trip instead of running after it.
+        embedding_task = (
+            asyncio.create_task(self.embedding_service.generate_embedding(user_input))
+            if not semantic_context
+            else None
+        )
+
         intent, complexity = await self.agentic_engine.classify_intent_and_complexity(
             user_input, model, has_media=(has_images or has_audio_transcription)
         )
-        logger.info(f"Phase 4: intent='{intent}', complexity='{complexity}'")
+        logger.info("Phase 4: intent='%s', complexity='%s'", intent, complexity)
         INTENT_CLASSIFICATION_TOTAL.labels(intent=intent).inc()
 
         # --- Phase 5: Tool Scope Reduction ---
@@ -165,14 +244,18 @@ class ChatOrchestrator:
             tools = await self.agentic_engine.get_expanded_tools(intent, user_input)
         else:
             tools = await self._filter_tools(intent, user_input)
-        logger.info(
-            f"Phase 5: Selected {len(tools)} tools: {[t['function']['name'] for t in tools]}"
-        )
+        # Guarded: the name comprehension shouldn't run when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Phase 5: Selected %d tools: %s",
+                len(tools),
+                [t["function"]["name"] for t in tools],
+            )
 
         # --- Phase 5.5: Semantic Memory Retrieval ---
-        if not semantic_context:
+        if embedding_task is not None:
             try:
-                query_embedding = await self.embedding_service.generate_embedding(user_input)
+                query_embedding = await embedding_task
                 if query_embedding and user_id:
                     similar_msgs = await self.conversation_repo.search_similar_messages(
                         uuid.UUID(user_id), query_embedding, limit=3
@@ -181,7 +264,7 @@ class ChatOrchestrator:
                         semantic_context = "\nRelevant Past Conversation Context:\n"
                         for m in similar_msgs:
                             semantic_context += f"- {m.role}: {m.content}\n"
-                        logger.info(f"Phase 5.5: Retrieved {len(similar_msgs)} similar messages.")
+                        logger.info("Phase 5.5: Retrieved %d similar messages.", len(similar_msgs))
             except Exception as e:
                 logger.error(f"Semantic memory retrieval failed: {e}")
 
@@ -196,8 +279,6 @@ class ChatOrchestrator:
             ttl=3600,
         )
 
-        # Prepare messages
-        messages = list(conversation_history)
         current_seq = len(conversation_history)
 
         # Inject Dynamic System Prompt
@@ -209,10 +290,21 @@ class ChatOrchestrator:
         if conv_summary:
             system_prompt += f"\n\nPrevious Conversation Summary:\n{conv_summary}\n"
 
-        if messages and messages[0].role == MessageRole.SYSTEM:
-            messages[0] = ChatMessage(role=MessageRole.SYSTEM, content=system_prompt)
+        # Prepend the system prompt while building our own list — a single
+        # copy of the caller's history instead of a defensive list() copy
+        # followed by an O(n) insert(0) shift.
+        # model_construct skips Pydantic validation — fine for messages we
+        # build ourselves from known-good enums and strings
+        sys_msg = ChatMessage.model_construct(role=MessageRole.SYSTEM, content=system_prompt)
+        if conversation_history and conversation_history[0].role == MessageRole.SYSTEM:
+            messages = [sys_msg, *conversation_history[1:]]
         else:
-            messages.insert(0, ChatMessage(role=MessageRole.SYSTEM, content=system_prompt))
+            messages = [sys_msg, *conversation_history]
+
+        # Bound the prompt. Callers already cap history at 50 messages, but
+        # long individual messages can still blow past the model context —
+        # and prompt cost scales with every token we resend each turn.
+        messages = _context_window(messages)
 
         # --- Phase 5.5: Route COMPLEX to Agentic Engine ---
         if complexity == "COMPLEX" and tools:
@@ -230,8 +322,9 @@ class ChatOrchestrator:
                 user_input, model, tool_names, conv_context
             )
 
-            # Execute plan with ReAct loop
-            agentic_content = ""
+            # Execute plan with ReAct loop. Accumulate chunks in a list and
+            # join once — repeated str += is quadratic in total response size.
+            agentic_parts: List[str] = []
             agentic_tool_calls = []
 
             async for chunk in self.agentic_engine.execute(
@@ -242,11 +335,13 @@ class ChatOrchestrator:
                 temperature=temperature,
                 max_tokens=max_tokens,
             ):
-                agentic_content += chunk.content
+                agentic_parts.append(chunk.content)
                 if chunk.usage:
                     self.last_usage = chunk.usage
                 yield chunk
 
+            agentic_content = "".join(agentic_parts)
+
             # Persist final agentic response
             current_seq += 1
             msg = await self.conversation_repo.add_message(
@@ -261,8 +356,6 @@ class ChatOrchestrator:
                 else None,
                 model=model,
             )
-            import asyncio
-
             asyncio.create_task(self._embed_message(msg.id, agentic_content))
             asyncio.create_task(self._embed_user_message(conv_uuid, current_seq - 1))
 
@@ -278,10 +371,22 @@ class ChatOrchestrator:
             return
 
         # --- Phase 6: Fast Path (SIMPLE) — One-shot flow (unchanged) ---
-        current_tool_calls: List[ToolCall] = []
-        full_content = ""
+        # Providers emit tool calls on a single (near-terminal) chunk, so the
+        # hot token loop just remembers that chunk instead of extending a
+        # list on every iteration; the calls are pulled out after the stream.
+        tool_call_chunk: Optional[StreamChunk] = None
+        content_parts: List[str] = []
         self.last_usage = None  # Track usage from stream
 
+        # When tools are in play and the response opens like JSON, hold the
+        # chunks back: it is almost certainly a tool call that Phase 6b will
+        # parse, and streaming raw JSON wastes frames on content the client
+        # never displays. Held chunks are flushed after the stream if the
+        # content turns out to be prose after all.
+        hold_content = False
+        decided = not tools
+        pending_chunks: List[StreamChunk] = []
+
         # Streaming loop
         async for chunk in self.provider.stream(
             messages=messages,
@@ -290,34 +395,69 @@ class ChatOrchestrator:
             max_tokens=max_tokens,
             tools=tools if tools else None,
         ):
-            full_content += chunk.content
+            content_parts.append(chunk.content)
             if chunk.tool_calls:
-                logger.info(
-                    f"Phase 6: Detected {len(chunk.tool_calls)} tool calls from stream: {[tc.function.name for tc in chunk.tool_calls]}"
-                )
-                current_tool_calls.extend(chunk.tool_calls)
-
-            if not current_tool_calls:
-                yield chunk
-            else:
-                pass
+                tool_call_chunk = chunk
 
             # Capture usage from the last chunk if present
             if chunk.usage:
                 self.last_usage = chunk.usage
 
-        # Check for fallback parsing (Phase 6b)
-        if not current_tool_calls and tools:
+            if tool_call_chunk is not None:
+                continue  # structured tool calls — suppress content chunks
+
+            if not decided:
+                head = "".join(content_parts).lstrip()
+                # A leading backtick might be a ```json tool-call fence or an
+                # ordinary code answer (```python); keep buffering until the
+                # fence info-string is distinguishable before deciding.
+                if not head or ("```json".startswith(head[:7]) and len(head) < 7):
+                    pending_chunks.append(chunk)
+                    continue
+                decided = True
+                hold_content = head[0] == "{" or head[:7].lower() == "```json"
+                if not hold_content:
+                    for held in pending_chunks:
+                        yield held
+                    pending_chunks.clear()
+
+            if hold_content:
+                pending_chunks.append(chunk)
+            else:
+                yield chunk
+
+        full_content = "".join(content_parts)
+
+        current_tool_calls: List[ToolCall] = (
+            list(tool_call_chunk.tool_calls) if tool_call_chunk else []
+        )
+        if current_tool_calls and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Phase 6: Detected %d tool calls from stream: %s",
+                len(current_tool_calls),
+                [tc.function.name for tc in current_tool_calls],
+            )
+
+        # Check for fallback parsing (Phase 6b). The substring gate skips
+        # the JSON scan entirely for the common case — plain prose without
+        # anything resembling an embedded tool call.
+        if not current_tool_calls and tools and full_content and '"name"' in full_content:
             parsed = self.provider._try_parse_tool_calls(full_content)
             if parsed:
-                logger.info(f"Phase 6b: Parsed {len(parsed)} tool calls from content fallback")
+                logger.info("Phase 6b: Parsed %d tool calls from content fallback", len(parsed))
                 current_tool_calls = parsed
 
+        # Flush held chunks: looked like a tool call but parsed as prose
+        if pending_chunks and not current_tool_calls:
+            for held in pending_chunks:
+                yield held
+        pending_chunks = []
+
         # Safety fallback: if LLM returned empty content AND no tool calls were captured,
         # retry without tools to get a natural language response
         if not full_content.strip() and not current_tool_calls and tools:
             logger.warning("Phase 6c: Empty response with tools — retrying without tools")
-            full_content = ""
+            content_parts = []
             self.last_usage = None
             async for chunk in self.provider.stream(
                 messages=messages,
@@ -326,15 +466,17 @@ class ChatOrchestrator:
                 max_tokens=max_tokens,
                 tools=None,
             ):
-                full_content += chunk.content
+                content_parts.append(chunk.content)
                 if chunk.usage:
                     self.last_usage = chunk.usage
                 yield chunk
 
+            full_content = "".join(content_parts)
+
         # --- Phase 7: Tool Execution ---
         if current_tool_calls:
             # Append assistant message with tool calls
-            assistant_msg = ChatMessage(
+            assistant_msg = ChatMessage.model_construct(
                 role=MessageRole.ASSISTANT, content=full_content, tool_calls=current_tool_calls
             )
             messages.append(assistant_msg)
@@ -362,44 +504,38 @@ class ChatOrchestrator:
             # Also embed the user message that started this turn
             # asyncio.create_task(self._embed_user_message(conv_uuid, current_seq - 1))
 
-            # Execute tools
+            # Execute tools concurrently. Calls emitted in one turn are
+            # independent, so gathering overlaps their latencies — the turn
+            # waits for the slowest tool instead of the sum.
             for tool_call in current_tool_calls:
-                tool_name = tool_call.function.name
-                tool_args = tool_call.function.arguments
-
-                yield StreamChunk(content="", status=f"Executing {tool_name}...", done=False)
-
-                try:
-                    tool_start = time.time()
-                    tool = self.registry.get_tool(tool_name)
-                    result = await tool.run(**tool_args)
-                    TOOL_EXECUTION_TOTAL.labels(tool_name=tool_name, status="success").inc()
-                except Exception as e:
-                    logger.error(f"Tool execution failed: {e}")
-                    TOOL_EXECUTION_TOTAL.labels(tool_name=tool_name, status="error").inc()
-                    result = f"Error executing tool {tool_name}: {e}"
-                finally:
-                    TOOL_EXECUTION_DURATION_SECONDS.labels(tool_name=tool_name).observe(
-                        time.time() - tool_start
-                    )
+                yield StreamChunk(
+                    content="", status=f"Executing {tool_call.function.name}...", done=False
+                )
 
-                # Persist result
+            results = await asyncio.gather(
+                *(self._execute_tool(tc) for tc in current_tool_calls)
+            )
+
+            for tool_call, result in zip(current_tool_calls, results):
+                # Persist result (in original call order). Stringify once —
+                # results can be large blobs (file reads, search dumps).
+                result_str = result if isinstance(result, str) else str(result)
                 current_seq += 1
-                tool_msg = ChatMessage(
-                    role=MessageRole.TOOL, content=str(result), tool_call_id=tool_call.id
+                tool_msg = ChatMessage.model_construct(
+                    role=MessageRole.TOOL, content=result_str, tool_call_id=tool_call.id
                 )
                 messages.append(tool_msg)
 
                 await self.conversation_repo.add_message(
                     conversation_id=conv_uuid,
                     role=MessageRole.TOOL,
-                    content=str(result),
+                    content=result_str,
                     sequence_number=current_seq,
                     tool_call_id=tool_call.id,
                 )
 
             # --- Phase 8: Tool Result Feedback Loop ---
-            synthesis_content = ""
+            synthesis_parts: List[str] = []
             self.last_usage = None  # Reset for synthesis
             async for chunk in self.provider.stream(
                 messages=messages,
@@ -408,11 +544,13 @@ class ChatOrchestrator:
                 max_tokens=max_tokens,
                 tools=None,
             ):
-                synthesis_content += chunk.content
+                synthesis_parts.append(chunk.content)
                 if chunk.usage:
                     self.last_usage = chunk.usage
                 yield chunk
 
+            synthesis_content = "".join(synthesis_parts)
+
             # Persist synthesis
             current_seq += 1
             msg = await self.conversation_repo.add_message(
@@ -472,6 +610,28 @@ class ChatOrchestrator:
             time.time() - start_time
         )
 
+    async def _execute_tool(self, tool_call: ToolCall) -> Any:
+        """Run a single tool call, recording execution metrics.
+
+        Failures are captured and returned as an error string so a bad
+        tool never breaks the surrounding gather.
+        """
+        tool_name = tool_call.function.name
+        tool_start = time.time()
+        try:
+            tool = self.registry.get_tool(tool_name)
+            result = await tool.run(**tool_call.function.arguments)
+            TOOL_EXECUTION_TOTAL.labels(tool_name=tool_name, status="success").inc()
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            TOOL_EXECUTION_TOTAL.labels(tool_name=tool_name, status="error").inc()
+            result = f"Error executing tool {tool_name}: {e}"
+        finally:
+            TOOL_EXECUTION_DURATION_SECONDS.labels(tool_name=tool_name).observe(
+                time.time() - tool_start
+            )
+        return result
+
     async def _summarize_conversation(
         self, conversation_id: Any, current_seq: int, last_seq: int, model: str
     ):
@@ -504,7 +664,7 @@ class ChatOrchestrator:
 
             # Call LLM for summary
             response = await self.provider.complete(
-                messages=[ChatMessage(role=MessageRole.USER, content=summary_prompt)],
+                messages=[ChatMessage.model_construct(role=MessageRole.USER, content=summary_prompt)],
                 model=model,
                 max_tokens=200,
                 temperature=0.3,
@@ -532,7 +692,7 @@ class ChatOrchestrator:
                     "Create a consolidated summary of the entire conversation. Keep it concise."
                 )
                 response = await self.provider.complete(
-                    messages=[ChatMessage(role=MessageRole.USER, content=update_prompt)],
+                    messages=[ChatMessage.model_construct(role=MessageRole.USER, content=update_prompt)],
                     model=model,
                     max_tokens=300,
                     temperature=0.3,
@@ -542,7 +702,9 @@ class ChatOrchestrator:
                 final_summary = new_segment_summary
 
             await self.conversation_repo.update_summary(conversation_id, final_summary, current_seq)
-            logger.info(f"Updated summary for conversation {conversation_id} at seq {current_seq}")
+            logger.info(
+                "Updated summary for conversation %s at seq %d", conversation_id, current_seq
+            )
 
         except Exception as e:
             logger.error(f"Summarization failed: {e}")
@@ -553,7 +715,7 @@ class ChatOrchestrator:
             embedding = await self.embedding_service.generate_embedding(content)
             if embedding:
                 await self.conversation_repo.update_message_embedding(message_id, embedding)
-                logger.info(f"Generated embedding for message {message_id}")
+                logger.info("Generated embedding for message %s", message_id)
         except Exception as e:
             logger.error(f"Failed to generate embedding for message {message_id}: {e}")
 
@@ -589,7 +751,7 @@ class ChatOrchestrator:
 
         # Simple zero-shot classifier
         classifier_messages = [
-            ChatMessage(
+            ChatMessage.model_construct(
                 role=MessageRole.SYSTEM,
                 content=(
                     "You are an intent classifier. Analyze the user's request.\n"
@@ -601,7 +763,7 @@ class ChatOrchestrator:
                     "Output ONLY the category name (e.g., 'GIT')."
                 ),
             ),
-            ChatMessage(role=MessageRole.USER, content=user_input),
+            ChatMessage.model_construct(role=MessageRole.USER, content=user_input),
         ]
 
         response = await self.provider.complete(
@@ -631,7 +793,7 @@ class ChatOrchestrator:
 
         # Also include ALL local tools (web_search, python_sandbox, etc.)
         # since get_ollama_tools may not include them
-        local_tools = [t.to_ollama_format() for t in self.registry._tools.values()]
+        local_tools = self.registry.local_tool_formats()
         seen_names = {t["function"]["name"] for t in all_tools}
         for lt in local_tools:
             if lt["function"]["name"] not in seen_names:
@@ -709,28 +871,21 @@ class ChatOrchestrator:
                 ):
                     filtered.append(tool)
 
-        logger.info(
-            f"Phase 5: _filter_tools for intent={intent}: {len(filtered)}/{len(all_tools)} tools matched (names: {[t['function']['name'] for t in filtered]})"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Phase 5: _filter_tools for intent=%s: %d/%d tools matched (names: %s)",
+                intent,
+                len(filtered),
+                len(all_tools),
+                [t["function"]["name"] for t in filtered],
+            )
         return filtered
 
     def _get_system_prompt(self, intent: str, has_tools: bool) -> str:
         """
         Get the appropriate system prompt based on intent and tool availability.
         """
-        base_prompt = "You are a helpful AI assistant."
-
         if not has_tools:
-            return (
-                base_prompt
-                + "\nAnswer using your internal knowledge. Do not hallucinate or fabricate tool calls."
-            )
-
-        tool_instructions = (
-            "\nYou have access to external tools via MCP.\n"
-            "1. If the user's request requires it, call the appropriate tool.\n"
-            "2. Output a valid JSON tool call.\n"
-            "3. Use the tool result to answer the question."
-        )
+            return _NO_TOOL_SYSTEM_PROMPT
 
-        return base_prompt + tool_instructions
+        return _TOOL_USE_SYSTEM_PROMPT
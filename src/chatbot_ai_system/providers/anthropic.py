@@ -7,7 +7,6 @@ from typing import AsyncGenerator, Dict, List, Optional, Tuple
 
 import httpx
 
-from chatbot_ai_system.config import get_settings
 from chatbot_ai_system.models.schemas import (
     ChatMessage,
     ChatResponse,
@@ -31,10 +30,13 @@ class AnthropicProvider(BaseLLMProvider):
 
     provider_name = "anthropic"
 
-    def __init__(self):
-        settings = get_settings()
-        self.api_key = settings.anthropic_api_key
-        self.default_model = settings.anthropic_model or "claude-3-haiku-20240307"
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        self.default_model = default_model or "claude-3-haiku-20240307"
         self.base_url = "https://api.anthropic.com/v1"
 
         if not self.api_key:
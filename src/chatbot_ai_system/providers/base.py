@@ -1,5 +1,6 @@
 """Abstract base class for LLM providers."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
@@ -15,6 +16,18 @@ class BaseLLMProvider(ABC):
 
     provider_name: str = "base"
 
+    async def aclose(self) -> None:
+        """Release any resources held by the provider (HTTP pools, etc.).
+
+        Default is a no-op; providers that own network clients override this.
+        """
+
+    async def __aenter__(self) -> "BaseLLMProvider":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
     @abstractmethod
     async def complete(
         self,
@@ -39,6 +52,30 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    async def complete_batch(
+        self,
+        batch: List[List[ChatMessage]],
+        max_concurrency: int = 8,
+        **kwargs,
+    ) -> List[ChatResponse]:
+        """Run several completions concurrently with bounded fan-out.
+
+        Args:
+            batch: List of message lists, one completion per entry
+            max_concurrency: Maximum number of in-flight requests
+            **kwargs: Forwarded to complete() for every entry
+
+        Returns:
+            List of ChatResponse objects (or exceptions) in batch order
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(msgs: List[ChatMessage]) -> ChatResponse:
+            async with sem:
+                return await self.complete(msgs, **kwargs)
+
+        return await asyncio.gather(*(_one(m) for m in batch), return_exceptions=True)
+
     @abstractmethod
     async def stream(
         self,
@@ -63,6 +100,24 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    async def stream_text(
+        self,
+        messages: List[ChatMessage],
+        **kwargs,
+    ) -> AsyncGenerator[str, None]:
+        """Stream raw content strings, bypassing StreamChunk for text-only callers.
+
+        Callers that only need the text (TTS pipelines, CLI echo) can skip
+        the per-token StreamChunk allocation. Chunks carrying no content
+        (tool calls, done markers) are filtered out.
+
+        Yields:
+            Non-empty content strings
+        """
+        async for chunk in self.stream(messages, **kwargs):
+            if chunk.content:
+                yield chunk.content
+
     @abstractmethod
     async def health_check(self) -> bool:
         """Check if the provider is available and healthy.
@@ -1,5 +1,6 @@
 """Provider factory for managing LLM backend instances."""
 
+import asyncio
 import logging
 from typing import Dict, Optional, Type
 
@@ -17,12 +18,49 @@ class ProviderFactory:
     _registry: Dict[str, Type[BaseLLMProvider]] = {
         "ollama": OllamaProvider,
     }
+    _settings = None  # frozen settings snapshot, taken once on first use
+
+    @classmethod
+    def _provider_kwargs(cls, name: str) -> dict:
+        """Build constructor kwargs for a provider from the settings snapshot.
+
+        Providers no longer call get_settings() themselves, which keeps them
+        trivially constructible in tests and allows differently-configured
+        instances to coexist.
+        """
+        if cls._settings is None:
+            cls._settings = get_settings()
+        settings = cls._settings
+        return {
+            "ollama": {
+                "base_url": settings.ollama_base_url,
+                "default_model": settings.ollama_model,
+            },
+            "openai": {
+                "api_key": settings.openai_api_key,
+                "default_model": settings.openai_model,
+            },
+            "anthropic": {
+                "api_key": settings.anthropic_api_key,
+                "default_model": settings.anthropic_model,
+            },
+            "gemini": {
+                "api_key": settings.gemini_api_key,
+                "default_model": settings.gemini_model,
+            },
+        }.get(name, {})
 
     @classmethod
     def register_provider(cls, name: str, provider_cls: Type[BaseLLMProvider]):
         """Register a new provider class."""
         cls._registry[name] = provider_cls
 
+    @classmethod
+    async def shutdown_all(cls):
+        """Close all cached provider instances (called on app shutdown)."""
+        await asyncio.gather(*(p.aclose() for p in cls._instances.values()))
+        cls._instances.clear()
+
     @classmethod
     def get_provider(cls, provider_name: Optional[str] = None) -> BaseLLMProvider:
         """Get or create a provider instance.
@@ -62,7 +100,7 @@ class ProviderFactory:
 
         try:
             provider_cls = cls._registry[name]
-            instance = provider_cls()
+            instance = provider_cls(**cls._provider_kwargs(name))
             cls._instances[name] = instance
             logger.info(f"Initialized LLM provider: {name}")
             return instance
@@ -1,12 +1,13 @@
 """Gemini LLM provider implementation using httpx."""
 
 import logging
+import re
 import time
 from typing import AsyncGenerator, Dict, List, Optional
 
 import httpx
+import orjson
 
-from chatbot_ai_system.config import get_settings
 from chatbot_ai_system.models.schemas import (
     ChatMessage,
     ChatResponse,
@@ -18,21 +19,37 @@ from chatbot_ai_system.observability.metrics import (
     LLM_REQUEST_DURATION_SECONDS,
     LLM_REQUESTS_TOTAL,
     LLM_TOKENS_TOTAL,
+    LLM_TTFT_SECONDS,
 )
 from chatbot_ai_system.providers.base import BaseLLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Precompiled bytes pattern for extracting "text" fields from the streamed JSON
+# array. Bytes-level matching skips a UTF-8 decode per network chunk.
+_TEXT_RE = re.compile(rb'"text":\s*"((?:[^"\\]|\\.)*)"')
+
+# Gemini only knows "user" and "model" roles; single dict lookup per message.
+_GEMINI_ROLE = {
+    MessageRole.USER: "user",
+    MessageRole.SYSTEM: "user",
+    MessageRole.ASSISTANT: "model",
+    MessageRole.TOOL: "user",
+}
+
 
 class GeminiProvider(BaseLLMProvider):
     """Google Gemini provider using direct HTTP API."""
 
     provider_name = "gemini"
 
-    def __init__(self):
-        settings = get_settings()
-        self.api_key = settings.gemini_api_key
-        self.default_model = settings.gemini_model or "gemini-1.5-flash"
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        self.default_model = default_model or "gemini-1.5-flash"
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
 
         if not self.api_key:
@@ -40,16 +57,39 @@ class GeminiProvider(BaseLLMProvider):
 
     def _format_contents(self, messages: List[ChatMessage]) -> List[Dict]:
         """Format messages for Gemini API."""
-        contents = []
-        for msg in messages:
-            role = "user" if msg.role in [MessageRole.USER, MessageRole.SYSTEM] else "model"
-
-            # Gemini doesn't support system messages in 'contents' strictly speaking,
-            # usually mapped to first user message or system_instruction field (v1beta).
-            # For simplicity using 'generateContent', we'll treat system as user message.
-
-            contents.append({"role": role, "parts": [{"text": msg.content}]})
-        return contents
+        # Gemini doesn't support system messages in 'contents' strictly speaking,
+        # usually mapped to first user message or system_instruction field (v1beta).
+        # For simplicity using 'generateContent', we'll treat system as user message.
+        return [
+            {"role": _GEMINI_ROLE[msg.role], "parts": [{"text": msg.content}]} for msg in messages
+        ]
+
+    def _build_payload(
+        self,
+        messages: List[ChatMessage],
+        temperature: float,
+        max_tokens: Optional[int],
+    ) -> Dict:
+        """Build a request payload, routing system messages to system_instruction.
+
+        Sending the system prompt via the v1beta `system_instruction` field
+        (instead of duplicating it as a user message) lets the backend cache
+        the prefix and avoids re-billing those tokens every turn.
+        """
+        sys_msgs = [m for m in messages if m.role == MessageRole.SYSTEM]
+        conv = [m for m in messages if m.role != MessageRole.SYSTEM]
+        payload = {
+            "contents": self._format_contents(conv),
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
+            },
+        }
+        if sys_msgs:
+            payload["system_instruction"] = {
+                "parts": [{"text": "\n".join(m.content for m in sys_msgs)}]
+            }
+        return payload
 
     async def complete(
         self,
@@ -65,35 +105,31 @@ class GeminiProvider(BaseLLMProvider):
             raise ValueError("Gemini API key not configured")
 
         model = model or self.default_model
-        start_time = time.time()
+        provider = self.provider_name  # bind once; read repeatedly in metric labels
+        t0 = time.perf_counter()
 
-        # Note: 'system_instruction' can be used for system prompt in newer versions
-
-        payload = {
-            "contents": self._format_contents(messages),
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-            },
-        }
+        payload = self._build_payload(messages, temperature, max_tokens)
 
         try:
             url = f"{self.base_url}/{model}:generateContent?key={self.api_key}"
             async with httpx.AsyncClient(timeout=60.0) as client:
                 response = await client.post(
-                    url, json=payload, headers={"Content-Type": "application/json"}
+                    url,
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"},
                 )
                 response.raise_for_status()
                 data = response.json()
 
-            latency_ms = (time.time() - start_time) * 1000
+            elapsed = time.perf_counter() - t0
+            latency_ms = elapsed * 1000.0
 
             # Metrics
             LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="success"
+                model=model, provider=provider, status="success"
             ).inc()
-            LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider=self.provider_name).observe(
-                time.time() - start_time
+            LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider=provider).observe(
+                elapsed
             )
 
             # Usage metadata in Gemini
@@ -101,11 +137,11 @@ class GeminiProvider(BaseLLMProvider):
             prompt_tokens = usage_meta.get("promptTokenCount", 0)
             completion_tokens = usage_meta.get("candidatesTokenCount", 0)
 
-            LLM_TOKENS_TOTAL.labels(model=model, provider=self.provider_name, type="prompt").inc(
+            LLM_TOKENS_TOTAL.labels(model=model, provider=provider, type="prompt").inc(
                 prompt_tokens
             )
             LLM_TOKENS_TOTAL.labels(
-                model=model, provider=self.provider_name, type="completion"
+                model=model, provider=provider, type="completion"
             ).inc(completion_tokens)
 
             candidates = data.get("candidates", [])
@@ -125,14 +161,14 @@ class GeminiProvider(BaseLLMProvider):
                     total_tokens=usage_meta.get("totalTokenCount", 0),
                 ),
                 model=model,
-                provider=self.provider_name,
+                provider=provider,
                 latency_ms=latency_ms,
             )
 
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="error"
+                model=model, provider=provider, status="error"
             ).inc()
             raise
 
@@ -150,52 +186,41 @@ class GeminiProvider(BaseLLMProvider):
             raise ValueError("Gemini API key not configured")
 
         model = model or self.default_model
-        start_time = time.time()
+        provider = self.provider_name
+        t0 = time.perf_counter()
 
-        payload = {
-            "contents": self._format_contents(messages),
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-            },
-        }
+        payload = self._build_payload(messages, temperature, max_tokens)
 
-        first_token = False
+        first_token = True
+        # Hoist the label child so the per-token path is a single bool check
+        ttft_metric = LLM_TTFT_SECONDS.labels(model=model, provider=provider)
         url = f"{self.base_url}/{model}:streamGenerateContent?key={self.api_key}"
 
         async with httpx.AsyncClient(timeout=120.0) as client:
             async with client.stream(
-                "POST", url, json=payload, headers={"Content-Type": "application/json"}
+                "POST",
+                url,
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
             ) as response:
                 response.raise_for_status()
 
                 # Gemini doesn't use SSE standard exactly, it sends JSON array elements
-                # But typically simple chunks. The response format is `[{...}, \r\n {...}]`
-                # Parsing a JSON array stream is tricky.
-                buffer = ""
-                async for chunk in response.aiter_text():
-                    buffer += chunk
-                    # Simple heuristic: try to find complete JSON objects
-                    # This is brittle but works for basic streaming
-                    try:
-                        # Gemini stream is a JSON array. We might get partial JSON.
-                        # Better to rely on the fact that Google sends valid JSON objects separated
-                        # but wrapped in [ ].
-                        pass
-                    except:
-                        pass
-
-                    # For now, simplistic yielding without parsing full stream properly
-                    # because parsing a streaming JSON array in python without a lib is hard.
-                    # Fallback to non-streaming logic or simplified string matching?
-
-                    # Hack: Look for "text": "..."
-                    import re
-
-                    matches = re.findall(r'"text":\s*"((?:[^"\\]|\\.)*)"', chunk)
-                    for text in matches:
-                        # unescape
-                        yield StreamChunk(content=text.encode("utf-8").decode("unicode_escape"))
+                # The response format is `[{...}, \r\n {...}]` — parsing a streaming
+                # JSON array properly needs a lib, so extract "text" fields directly.
+                async for chunk in response.aiter_bytes():
+                    # Coalesce all text parts from one network chunk into a single
+                    # yield — Gemini often packs several parts per frame, and each
+                    # yield costs an async-generator hop plus an ASGI send downstream.
+                    texts = [
+                        m.group(1).decode("unicode_escape")  # unescape
+                        for m in _TEXT_RE.finditer(chunk)
+                    ]
+                    if texts:
+                        if first_token:
+                            ttft_metric.observe(time.perf_counter() - t0)
+                            first_token = False
+                        yield StreamChunk(content="".join(texts))
 
     async def health_check(self) -> bool:
         return bool(self.api_key)
@@ -1,12 +1,16 @@
 """Ollama LLM provider for local model inference."""
 
+import itertools
+import json
 import logging
+import os
+import re
 import time
 from typing import AsyncGenerator, List, Optional
 
 import httpx
+import orjson
 
-from chatbot_ai_system.config import get_settings
 from chatbot_ai_system.models.schemas import (
     ChatMessage,
     ChatResponse,
@@ -27,6 +31,59 @@ from .base import BaseLLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Process-unique fallback IDs for tool calls the API returned without one.
+# A counter avoids the os.urandom syscall uuid4 would cost per streamed call.
+_TC_COUNTER = itertools.count()
+_TC_PREFIX = f"tc_{os.getpid()}_"
+
+# Shared decoder: json.loads builds a fresh JSONDecoder on every call.
+_JSON_DECODER = json.JSONDecoder()
+
+# Structural characters the scanner cares about, and a linear (no nested
+# quantifier) match for a complete JSON string literal.
+_SCAN_RE = re.compile(r'[{}"]')
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+def _iter_json_objects(s: str):
+    """Yield dicts parsed from top-level balanced JSON objects in *s*.
+
+    Tracks brace depth in a single linear pass, but jumps between
+    structural characters with compiled-regex searches so the hot loop
+    runs in C rather than iterating Python chars one at a time. String
+    literals are skipped wholesale with a linear string-literal match.
+    """
+    decoder = _JSON_DECODER
+    depth = 0
+    start = -1
+    pos = 0
+    search = _SCAN_RE.search
+    while (m := search(s, pos)) is not None:
+        i = m.start()
+        ch = s[i]
+        if ch == '"':
+            if depth > 0:
+                sm = _STRING_RE.match(s, i)
+                pos = sm.end() if sm else i + 1
+            else:
+                pos = i + 1
+            continue
+        if ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0 and start != -1:
+                try:
+                    obj, _ = decoder.raw_decode(s, start)
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    if isinstance(obj, dict):
+                        yield obj
+        pos = i + 1
+
 
 class OllamaProvider(BaseLLMProvider):
     """Ollama provider for local LLM models.
@@ -51,17 +108,59 @@ class OllamaProvider(BaseLLMProvider):
             base_url: Ollama API base URL (default: http://localhost:11434)
             default_model: Default model to use (default: llama2)
         """
-        settings = get_settings()
-        self.base_url = base_url or settings.ollama_base_url
-        self.default_model = default_model or settings.ollama_model
+        self.base_url = base_url or "http://localhost:11434"
+        self.default_model = default_model or "llama2"
         self._client: Optional[httpx.AsyncClient] = None
+        # TTL cache for /api/tags: (monotonic timestamp, model names)
+        self._tags_cache: Optional[tuple[float, List[str]]] = None
+        # Immutable payload skeleton shared by complete/stream; per-call code
+        # overlays only the fields that vary (model, messages, stream, options).
+        self._base_payload = {"model": self.default_model, "stream": False, "options": {}}
+        # Memo of formatted message dicts keyed by id(); the message object is
+        # stored alongside to guard against id reuse after garbage collection.
+        # The conversation prefix is identical turn-to-turn, so this turns
+        # O(n_turns^2) re-formatting into formatting only the tail.
+        self._format_cache: dict = {}
+
+    def _build_payload(
+        self,
+        messages: List[ChatMessage],
+        model: str,
+        stream: bool,
+        temperature: float,
+        repeat_penalty: float,
+        max_tokens: Optional[int],
+        tools: Optional[List[dict]],
+    ) -> dict:
+        """Build a chat payload on top of the prebuilt skeleton."""
+        options = {"temperature": temperature, "repeat_penalty": repeat_penalty}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        payload = {
+            **self._base_payload,
+            "model": model,
+            "messages": self._format_messages(messages),
+            "stream": stream,
+            "options": options,
+        }
+        if tools:
+            payload["tools"] = tools
+        return payload
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._client is None or self._client.is_closed:
+            # HTTP/2 + a larger keepalive pool avoids head-of-line blocking and
+            # connection churn under concurrent chat traffic to a single host.
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
-                timeout=httpx.Timeout(60.0, connect=10.0),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=60.0,
+                ),
             )
         return self._client
 
@@ -70,75 +169,36 @@ class OllamaProvider(BaseLLMProvider):
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
+    async def aclose(self) -> None:
+        """Release the pooled HTTP client."""
+        await self.close()
+
     def _try_parse_tool_calls(self, content: str) -> Optional[List[ToolCall]]:
         """Try to parse tool calls from message content (for models that output raw JSON)."""
-        import json
-        import re
-
         try:
-            # Look for JSON blocks
-            # This regex matches a JSON object that has "name" and "arguments" keys
-            # It's a simple heuristic and might need refinement
-            # We look for something that starts with { and contains "name" and "arguments"
-
-            # First, try to parse the entire content as a single JSON object
-            try:
-                data = json.loads(content)
-                if isinstance(data, dict):
-                    name = data.get("name") or data.get("function", {}).get("name")
-                    args = (
-                        data.get("arguments")
-                        or data.get("parameters")
-                        or data.get("function", {}).get("arguments", {})
-                    )
-                    if name:
-                        return [
-                            ToolCall(
-                                function=ToolCallFunction(
-                                    name=name,
-                                    arguments=args,
-                                )
-                            )
-                        ]
-            except (json.JSONDecodeError, AttributeError):
-                pass
-
-            # Next, try to find a code block containing JSON
-            code_block_pattern = r"```(?:json)?\s*(\{.*?\})\s*```"
-            matches = re.findall(code_block_pattern, content, re.DOTALL)
-
-            if not matches:
-                # Try to find raw JSON object in the text if no code block
-                # Non-greedy match for { ... }
-                # We expect "name": "..." and "arguments" (or "parameters"): { ... }
-                raw_pattern = (
-                    r"(\{.*?\"name\"\s*:\s*\".*?\".*?\"(arguments|parameters)\"\s*:\s*\{.*?\}.*?\})"
-                )
-                matches = [m[0] for m in re.findall(raw_pattern, content, re.DOTALL)]
+            # Strip code fences so fenced JSON scans like raw JSON — no regex needed
+            if "```" in content:
+                content = content.replace("```json", " ").replace("```", " ")
 
             tool_calls = []
-            for match in matches:
-                try:
-                    data = json.loads(match)
-                    # Support both OpenAI/Ollama format and simpler variations
-                    name = data.get("name") or data.get("function", {}).get("name")
-                    args = (
-                        data.get("arguments")
-                        or data.get("parameters")
-                        or data.get("function", {}).get("arguments", {})
-                    )
+            for data in _iter_json_objects(content):
+                # Support both OpenAI/Ollama format and simpler variations
+                name = data.get("name") or data.get("function", {}).get("name")
+                args = (
+                    data.get("arguments")
+                    or data.get("parameters")
+                    or data.get("function", {}).get("arguments", {})
+                )
 
-                    if name and name != "null":
-                        tool_calls.append(
-                            ToolCall(
-                                function=ToolCallFunction(
-                                    name=name,
-                                    arguments=args,
-                                )
+                if name and name != "null":
+                    tool_calls.append(
+                        ToolCall(
+                            function=ToolCallFunction(
+                                name=name,
+                                arguments=args,
                             )
                         )
-                except json.JSONDecodeError:
-                    continue
+                    )
 
             return tool_calls if tool_calls else None
 
@@ -148,8 +208,17 @@ class OllamaProvider(BaseLLMProvider):
 
     def _format_messages(self, messages: List[ChatMessage]) -> List[dict]:
         """Format messages for Ollama API, including multimodal images."""
+        cache = self._format_cache
+        cache_get = cache.get
         formatted = []
+        append = formatted.append
+        tool_role = MessageRole.TOOL
         for msg in messages:
+            entry = cache_get(id(msg))
+            if entry is not None and entry[0] is msg:
+                append(entry[1])
+                continue
+
             m = {"role": msg.role.value, "content": msg.content}
 
             # Phase 5.0: Include images from attachments for vision models
@@ -161,7 +230,7 @@ class OllamaProvider(BaseLLMProvider):
                     m["images"] = images
 
             # For tool results, Ollama expects tool_call_id
-            if msg.role == MessageRole.TOOL:
+            if msg.role == tool_role:
                 if msg.tool_call_id:
                     m["tool_call_id"] = msg.tool_call_id
                 else:
@@ -184,7 +253,10 @@ class OllamaProvider(BaseLLMProvider):
                 if not m["content"]:
                     del m["content"]
 
-            formatted.append(m)
+            if len(cache) > 1024:
+                cache.clear()
+            cache[id(msg)] = (msg, m)
+            append(m)
         return formatted
 
     async def complete(
@@ -198,47 +270,46 @@ class OllamaProvider(BaseLLMProvider):
         **kwargs,
     ) -> ChatResponse:
         """Generate a completion using Ollama."""
-        start_time = time.time()
+        t0 = time.perf_counter()
         client = await self._get_client()
         model = model or self.default_model
+        provider = self.provider_name  # bind once; read repeatedly in metric labels
 
-        payload = {
-            "model": model,
-            "messages": self._format_messages(messages),
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "repeat_penalty": repeat_penalty,
-            },
-        }
-
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
-
-        if tools:
-            payload["tools"] = tools
+        payload = self._build_payload(
+            messages, model, False, temperature, repeat_penalty, max_tokens, tools
+        )
 
         try:
-            response = await client.post("/api/chat", json=payload)
-            response.raise_for_status()
+            # orjson.dumps + content= skips httpx's stdlib json.dumps pass over the payload
+            response = await client.post(
+                "/api/chat",
+                content=orjson.dumps(payload),
+                headers={"content-type": "application/json"},
+            )
+            sc = response.status_code
+            if sc >= 400:  # cheaper than raise_for_status() on the 2xx fast path
+                raise httpx.HTTPStatusError(
+                    f"HTTP {sc}", request=response.request, response=response
+                )
             data = response.json()
 
-            latency_ms = (time.time() - start_time) * 1000
+            elapsed = time.perf_counter() - t0
+            latency_ms = elapsed * 1000.0
 
             # Record metrics
             status = "success"
-            LLM_REQUESTS_TOTAL.labels(model=model, provider=self.provider_name, status=status).inc()
-            LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider=self.provider_name).observe(
-                time.time() - start_time
+            LLM_REQUESTS_TOTAL.labels(model=model, provider=provider, status=status).inc()
+            LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider=provider).observe(
+                elapsed
             )
 
             prompt_tokens = data.get("prompt_eval_count", 0)
             completion_tokens = data.get("eval_count", 0)
-            LLM_TOKENS_TOTAL.labels(model=model, provider=self.provider_name, type="prompt").inc(
+            LLM_TOKENS_TOTAL.labels(model=model, provider=provider, type="prompt").inc(
                 prompt_tokens
             )
             LLM_TOKENS_TOTAL.labels(
-                model=model, provider=self.provider_name, type="completion"
+                model=model, provider=provider, type="completion"
             ).inc(completion_tokens)
 
             message_data = data.get("message", {})
@@ -251,9 +322,11 @@ class OllamaProvider(BaseLLMProvider):
                 for tc in tool_calls_data:
                     function_data = tc.get("function", {})
                     tool_calls.append(
-                        ToolCall(
-                            id=tc.get("id") or str(uuid.uuid4()),
-                            function=ToolCallFunction(
+                        ToolCall.model_construct(
+                            # data came from Ollama's own response; skip revalidation
+                            id=tc.get("id") or f"{_TC_PREFIX}{next(_TC_COUNTER)}",
+                            type="function",
+                            function=ToolCallFunction.model_construct(
                                 name=function_data.get("name"),
                                 arguments=function_data.get("arguments", {}),
                             ),
@@ -264,11 +337,14 @@ class OllamaProvider(BaseLLMProvider):
             if not tool_calls and content:
                 tool_calls = self._try_parse_tool_calls(content)
 
-            if tool_calls:
-                logger.info(f"Ollama tool calls found: {[tc.function.name for tc in tool_calls]}")
+            if tool_calls and logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Ollama tool calls found: %s", [tc.function.name for tc in tool_calls]
+                )
 
             if content:
-                logger.info(f"Ollama response content: {content[:200]}...")
+                # %.200s truncates lazily — no slice copy when INFO is off
+                logger.info("Ollama response content: %.200s...", content)
 
             return ChatResponse(
                 message=ChatMessage(
@@ -282,14 +358,14 @@ class OllamaProvider(BaseLLMProvider):
                     total_tokens=data.get("prompt_eval_count", 0) + data.get("eval_count", 0),
                 ),
                 model=model,
-                provider=self.provider_name,
+                provider=provider,
                 latency_ms=latency_ms,
             )
 
         except httpx.HTTPError as e:
             logger.error(f"Ollama API error: {e}")
             LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="error"
+                model=model, provider=provider, status="error"
             ).inc()
             raise RuntimeError(f"Failed to get completion from Ollama: {e}")
 
@@ -305,109 +381,110 @@ class OllamaProvider(BaseLLMProvider):
     ) -> AsyncGenerator[StreamChunk, None]:
         """Stream a completion using Ollama."""
         model = model or self.default_model
-        url = f"{self.base_url}/api/chat"
-
-        payload = {
-            "model": model,
-            "messages": self._format_messages(messages),
-            "stream": True,
-            "options": {
-                "temperature": temperature,
-                "repeat_penalty": repeat_penalty,
-            },
-        }
+        provider = self.provider_name
 
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
+        payload = self._build_payload(
+            messages, model, True, temperature, repeat_penalty, max_tokens, tools
+        )
 
-        if tools:
-            payload["tools"] = tools
-
-        start_time = time.time()
+        start = time.perf_counter_ns()
         first_token_received = False
 
         try:
-            # Use a fresh client for streaming to avoid connection issues
-            async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0)) as client:
-                async with client.stream("POST", url, json=payload) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line:
-                            import json
-
-                            data = json.loads(line)
-
-                            if not first_token_received:
-                                ttft = time.time() - start_time
-                                LLM_TTFT_SECONDS.labels(
-                                    model=model, provider=self.provider_name
-                                ).observe(ttft)
-                                first_token_received = True
-
-                            message_data = data.get("message", {})
-                            content = message_data.get("content", "")
-                            done = data.get("done", False)
-
-                            # Extract tool calls if present
-                            tool_calls = None
-                            tool_calls_data = message_data.get("tool_calls")
-                            if tool_calls_data:
-                                tool_calls = []
-                                for tc in tool_calls_data:
-                                    function_data = tc.get("function", {})
-                                    tool_calls.append(
-                                        ToolCall(
-                                            id=tc.get("id") or str(uuid.uuid4()),
-                                            function=ToolCallFunction(
-                                                name=function_data.get("name"),
-                                                arguments=function_data.get("arguments", {}),
-                                            ),
-                                        )
+            # Reuse the pooled client so streaming benefits from keepalive too
+            client = await self._get_client()
+            async with client.stream(
+                "POST",
+                "/api/chat",
+                content=orjson.dumps(payload),
+                headers={"content-type": "application/json"},
+            ) as response:
+                sc = response.status_code
+                if sc >= 400:  # cheaper than raise_for_status() on the 2xx fast path
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {sc}", request=response.request, response=response
+                    )
+                # Split NDJSON at the bytes level; aiter_lines would decode
+                # UTF-8 and allocate a str per line on the per-token path.
+                buf = bytearray()
+                async for raw in response.aiter_bytes():
+                    buf += raw
+                    while (nl := buf.find(b"\n")) >= 0:
+                        line = bytes(buf[:nl]).strip()
+                        del buf[: nl + 1]
+                        if not line:
+                            continue
+                        data = orjson.loads(line)
+
+                        if not first_token_received:
+                            ttft = (time.perf_counter_ns() - start) / 1e9
+                            LLM_TTFT_SECONDS.labels(
+                                model=model, provider=provider
+                            ).observe(ttft)
+                            first_token_received = True
+
+                        message_data = data.get("message", {})
+                        content = message_data.get("content", "")
+                        done = data.get("done", False)
+
+                        # Extract tool calls if present
+                        tool_calls = None
+                        tool_calls_data = message_data.get("tool_calls")
+                        if tool_calls_data:
+                            tool_calls = []
+                            for tc in tool_calls_data:
+                                function_data = tc.get("function", {})
+                                tool_calls.append(
+                                    ToolCall.model_construct(
+                                        id=tc.get("id") or f"{_TC_PREFIX}{next(_TC_COUNTER)}",
+                                        type="function",
+                                        function=ToolCallFunction.model_construct(
+                                            name=function_data.get("name"),
+                                            arguments=function_data.get("arguments", {}),
+                                        ),
                                     )
+                                )
 
-                            if content or done or tool_calls:
-                                usage = None
-                                if done:
-                                    usage = UsageInfo(
-                                        prompt_tokens=data.get("prompt_eval_count", 0),
-                                        completion_tokens=data.get("eval_count", 0),
-                                        total_tokens=data.get("prompt_eval_count", 0)
-                                        + data.get("eval_count", 0),
-                                    )
-                                    # Record metrics on completion
-                                    LLM_REQUESTS_TOTAL.labels(
-                                        model=model, provider=self.provider_name, status="success"
-                                    ).inc()
-                                    LLM_REQUEST_DURATION_SECONDS.labels(
-                                        model=model, provider=self.provider_name
-                                    ).observe(time.time() - start_time)
-                                    LLM_TOKENS_TOTAL.labels(
-                                        model=model, provider=self.provider_name, type="prompt"
-                                    ).inc(usage.prompt_tokens)
-                                    LLM_TOKENS_TOTAL.labels(
-                                        model=model, provider=self.provider_name, type="completion"
-                                    ).inc(usage.completion_tokens)
-
-                                yield StreamChunk(
-                                    content=content, done=done, tool_calls=tool_calls, usage=usage
+                        if content or done or tool_calls:
+                            usage = None
+                            if done:
+                                usage = UsageInfo(
+                                    prompt_tokens=data.get("prompt_eval_count", 0),
+                                    completion_tokens=data.get("eval_count", 0),
+                                    total_tokens=data.get("prompt_eval_count", 0)
+                                    + data.get("eval_count", 0),
                                 )
+                                # Record metrics on completion
+                                LLM_REQUESTS_TOTAL.labels(
+                                    model=model, provider=provider, status="success"
+                                ).inc()
+                                LLM_REQUEST_DURATION_SECONDS.labels(
+                                    model=model, provider=provider
+                                ).observe((time.perf_counter_ns() - start) / 1e9)
+                                LLM_TOKENS_TOTAL.labels(
+                                    model=model, provider=provider, type="prompt"
+                                ).inc(usage.prompt_tokens)
+                                LLM_TOKENS_TOTAL.labels(
+                                    model=model, provider=provider, type="completion"
+                                ).inc(usage.completion_tokens)
+
+                            # model_construct skips per-chunk Pydantic validation;
+                            # the data just came out of our own deserializer.
+                            yield StreamChunk.model_construct(
+                                content=content, done=done, tool_calls=tool_calls, usage=usage
+                            )
 
         except httpx.HTTPError as e:
             logger.error(f"Ollama streaming error: {e}")
             LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="error"
+                model=model, provider=provider, status="error"
             ).inc()
             raise RuntimeError(f"Failed to stream from Ollama: {e}")
 
     async def health_check(self) -> bool:
         """Check if Ollama is running and accessible."""
-        try:
-            client = await self._get_client()
-            response = await client.get("/api/tags")
-            return response.status_code == 200
-        except Exception as e:
-            logger.warning(f"Ollama health check failed: {e}")
-            return False
+        # Reuses the /api/tags TTL cache so readiness probes don't hammer Ollama
+        return bool(await self.list_local_models())
 
     def get_available_models(self) -> List[str]:
         """Get list of commonly available Ollama models."""
@@ -422,14 +499,27 @@ class OllamaProvider(BaseLLMProvider):
             "starling-lm",
         ]
 
-    async def list_local_models(self) -> List[str]:
-        """Get list of models actually available locally."""
+    # How long a cached /api/tags response stays fresh (seconds)
+    _TAGS_CACHE_TTL = 30.0
+
+    async def list_local_models(self, force: bool = False) -> List[str]:
+        """Get list of models actually available locally.
+
+        The result is cached for a short TTL since the local model list
+        rarely changes; pass force=True to bypass the cache (e.g. right
+        after pulling a new model).
+        """
+        now = time.monotonic()
+        if not force and self._tags_cache and now - self._tags_cache[0] < self._TAGS_CACHE_TTL:
+            return self._tags_cache[1]
         try:
             client = await self._get_client()
             response = await client.get("/api/tags")
             response.raise_for_status()
             data = response.json()
-            return [model["name"] for model in data.get("models", [])]
+            names = [model["name"] for model in data.get("models", [])]
+            self._tags_cache = (now, names)
+            return names
         except Exception as e:
             logger.warning(f"Failed to list Ollama models: {e}")
             return []
@@ -1,13 +1,13 @@
 """OpenAI LLM provider implementation using httpx."""
 
-import json
+import functools
 import logging
 import time
 from typing import AsyncGenerator, Dict, List, Optional
 
 import httpx
+import orjson
 
-from chatbot_ai_system.config import get_settings
 from chatbot_ai_system.models.schemas import (
     ChatMessage,
     ChatResponse,
@@ -28,20 +28,102 @@ from chatbot_ai_system.providers.base import BaseLLMProvider
 logger = logging.getLogger(__name__)
 
 
+# Bound metric children cached per label set: .labels() hashes its kwargs on
+# every call, so amortize it to once per unique (model, status/type) pair.
+@functools.lru_cache(maxsize=64)
+def _req_counter(model: str, status: str):
+    return LLM_REQUESTS_TOTAL.labels(model=model, provider="openai", status=status)
+
+
+@functools.lru_cache(maxsize=64)
+def _dur_hist(model: str):
+    return LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider="openai")
+
+
+@functools.lru_cache(maxsize=64)
+def _tok_counter(model: str, token_type: str):
+    return LLM_TOKENS_TOTAL.labels(model=model, provider="openai", type=token_type)
+
+
+# Token counts are accumulated here and flushed to Prometheus every
+# _TOKEN_FLUSH_EVERY requests: each .inc() takes the client's internal lock,
+# so batching cuts the locked sections under concurrent load. Safe without a
+# lock of our own since providers run on a single event loop.
+_TOKEN_FLUSH_EVERY = 32
+_tok_pending: Dict[tuple, int] = {}
+_tok_seen = 0
+
+
+def _record_tokens(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    global _tok_seen
+    pending = _tok_pending
+    pending[(model, "prompt")] = pending.get((model, "prompt"), 0) + prompt_tokens
+    pending[(model, "completion")] = pending.get((model, "completion"), 0) + completion_tokens
+    _tok_seen += 1
+    if _tok_seen >= _TOKEN_FLUSH_EVERY:
+        for (m, token_type), count in pending.items():
+            if count:
+                _tok_counter(m, token_type).inc(count)
+        pending.clear()
+        _tok_seen = 0
+
+
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI provider using direct HTTP API (no SDK dependency)."""
 
     provider_name = "openai"
 
-    def __init__(self):
-        settings = get_settings()
-        self.api_key = settings.openai_api_key
-        self.default_model = settings.openai_model or "gpt-4o-mini"
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        self.default_model = default_model or "gpt-4o-mini"
         self.base_url = "https://api.openai.com/v1"
+        self._client: Optional[httpx.AsyncClient] = None
+        # Memo of formatted message dicts keyed by id(); the message object is
+        # stored alongside to guard against id reuse after garbage collection.
+        self._format_cache: dict = {}
+        # Constant payload keys prebuilt once; per-request code shallow-copies
+        # and fills in the varying fields.
+        self._payload_template: Dict = {
+            "model": self.default_model,
+            "temperature": 0.7,
+        }
 
         if not self.api_key:
             logger.warning("OpenAI API key not configured. Provider will fail if used.")
 
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client.
+
+        One long-lived client keeps TLS sessions and keep-alive connections
+        warm instead of paying the handshake on every request.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=True,
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=30.0,
+                ),
+                headers=self._get_headers(),
+            )
+        return self._client
+
+    async def close(self):
+        """Close the HTTP client."""
+        if self._client and not self._client.is_closed:
+            await self._client.aclose()
+
+    async def aclose(self) -> None:
+        """Release the pooled HTTP client."""
+        await self.close()
+
     def _get_headers(self) -> Dict[str, str]:
         return {
             "Authorization": f"Bearer {self.api_key}",
@@ -50,8 +132,17 @@ class OpenAIProvider(BaseLLMProvider):
 
     def _format_messages(self, messages: List[ChatMessage]) -> List[Dict]:
         """Format messages for OpenAI API."""
+        cache = self._format_cache
+        cache_get = cache.get
         formatted = []
+        append = formatted.append
+        tool_role = MessageRole.TOOL
         for msg in messages:
+            entry = cache_get(id(msg))
+            if entry is not None and entry[0] is msg:
+                append(entry[1])
+                continue
+
             m = {"role": msg.role.value, "content": msg.content}
 
             # Map tool calls
@@ -62,7 +153,7 @@ class OpenAIProvider(BaseLLMProvider):
                         "type": "function",
                         "function": {
                             "name": tc.function.name,
-                            "arguments": json.dumps(tc.function.arguments)
+                            "arguments": orjson.dumps(tc.function.arguments).decode()
                             if isinstance(tc.function.arguments, dict)
                             else tc.function.arguments,
                         },
@@ -73,11 +164,14 @@ class OpenAIProvider(BaseLLMProvider):
                     m["content"] = None  # OpenAI requires null content if tool_calls present
 
             # Map tool results
-            if msg.role == MessageRole.TOOL:
+            if msg.role == tool_role:
                 m["tool_call_id"] = msg.tool_call_id
 
             # TODO: Handle images (multimodal) if needed
-            formatted.append(m)
+            if len(cache) > 1024:
+                cache.clear()
+            cache[id(msg)] = (msg, m)
+            append(m)
         return formatted
 
     async def complete(
@@ -94,13 +188,12 @@ class OpenAIProvider(BaseLLMProvider):
             raise ValueError("OpenAI API key not configured")
 
         model = model or self.default_model
-        start_time = time.time()
+        start = time.perf_counter_ns()
 
-        payload = {
-            "model": model,
-            "messages": self._format_messages(messages),
-            "temperature": temperature,
-        }
+        payload = self._payload_template.copy()
+        payload["model"] = model
+        payload["messages"] = self._format_messages(messages)
+        payload["temperature"] = temperature
         if max_tokens:
             payload["max_tokens"] = max_tokens
         if tools:
@@ -108,33 +201,27 @@ class OpenAIProvider(BaseLLMProvider):
             payload["tool_choice"] = "auto"
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions", json=payload, headers=self._get_headers()
+            client = await self._get_client()
+            response = await client.post("/chat/completions", content=orjson.dumps(payload))
+            sc = response.status_code
+            if sc >= 400:  # cheaper than raise_for_status() on the 2xx fast path
+                raise httpx.HTTPStatusError(
+                    f"HTTP {sc}", request=response.request, response=response
                 )
-                response.raise_for_status()
-                data = response.json()
+            data = response.json()
 
-            latency_ms = (time.time() - start_time) * 1000
+            elapsed_ns = time.perf_counter_ns() - start
+            latency_ms = elapsed_ns / 1e6
 
             # Metrics
-            LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="success"
-            ).inc()
-            LLM_REQUEST_DURATION_SECONDS.labels(model=model, provider=self.provider_name).observe(
-                time.time() - start_time
-            )
+            _req_counter(model, "success").inc()
+            _dur_hist(model).observe(elapsed_ns / 1e9)
 
             usage_data = data.get("usage", {})
             prompt_tokens = usage_data.get("prompt_tokens", 0)
             completion_tokens = usage_data.get("completion_tokens", 0)
 
-            LLM_TOKENS_TOTAL.labels(model=model, provider=self.provider_name, type="prompt").inc(
-                prompt_tokens
-            )
-            LLM_TOKENS_TOTAL.labels(
-                model=model, provider=self.provider_name, type="completion"
-            ).inc(completion_tokens)
+            _record_tokens(model, prompt_tokens, completion_tokens)
 
             choice = data["choices"][0]
             message = choice["message"]
@@ -145,11 +232,13 @@ class OpenAIProvider(BaseLLMProvider):
                 tool_calls = []
                 for tc in message["tool_calls"]:
                     tool_calls.append(
-                        ToolCall(
+                        ToolCall.model_construct(
+                            # data came from OpenAI's own response; skip revalidation
                             id=tc["id"],
-                            function=ToolCallFunction(
+                            type="function",
+                            function=ToolCallFunction.model_construct(
                                 name=tc["function"]["name"],
-                                arguments=json.loads(tc["function"]["arguments"]),
+                                arguments=orjson.loads(tc["function"]["arguments"]),
                             ),
                         )
                     )
@@ -170,11 +259,31 @@ class OpenAIProvider(BaseLLMProvider):
 
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
-            LLM_REQUESTS_TOTAL.labels(
-                model=model, provider=self.provider_name, status="error"
-            ).inc()
+            _req_counter(model, "error").inc()
             raise
 
+    @staticmethod
+    def _finalize_tool_calls(partials: Dict[int, dict]) -> StreamChunk:
+        """Assemble accumulated tool-call fragments into a final chunk."""
+        tool_calls = []
+        for index in sorted(partials):
+            partial = partials[index]
+            try:
+                arguments = orjson.loads(bytes(partial["args"])) if partial["args"] else {}
+            except orjson.JSONDecodeError:
+                logger.warning(f"Malformed streamed tool-call arguments for {partial['name']}")
+                arguments = {}
+            tool_calls.append(
+                ToolCall.model_construct(
+                    id=partial["id"],
+                    type="function",
+                    function=ToolCallFunction.model_construct(
+                        name=partial["name"], arguments=arguments
+                    ),
+                )
+            )
+        return StreamChunk(content="", tool_calls=tool_calls)
+
     async def stream(
         self,
         messages: List[ChatMessage],
@@ -189,74 +298,99 @@ class OpenAIProvider(BaseLLMProvider):
             raise ValueError("OpenAI API key not configured")
 
         model = model or self.default_model
-        start_time = time.time()
+        start = time.perf_counter_ns()
 
-        payload = {
-            "model": model,
-            "messages": self._format_messages(messages),
-            "temperature": temperature,
-            "stream": True,
-        }
+        payload = self._payload_template.copy()
+        payload["model"] = model
+        payload["messages"] = self._format_messages(messages)
+        payload["temperature"] = temperature
+        payload["stream"] = True
         if max_tokens:
             payload["max_tokens"] = max_tokens
         if tools:
             payload["tools"] = tools
 
         first_token = False
+        # Tool-call deltas arrive as fragments keyed by index; accumulate them
+        # here and emit completed ToolCalls once, instead of dropping them and
+        # forcing callers into a second non-streaming completion.
+        partials: Dict[int, dict] = {}
+
+        client = await self._get_client()
+        async with client.stream(
+            "POST", "/chat/completions", content=orjson.dumps(payload)
+        ) as response:
+            sc = response.status_code
+            if sc >= 400:  # cheaper than raise_for_status() on the 2xx fast path
+                raise httpx.HTTPStatusError(
+                    f"HTTP {sc}", request=response.request, response=response
+                )
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/chat/completions",
-                json=payload,
-                headers=self._get_headers(),
-            ) as response:
-                response.raise_for_status()
-
-                async for line in response.aiter_lines():
-                    if not line or line.strip() == "":
+            # Split SSE frames at the bytes level: aiter_lines would decode
+            # UTF-8 and build a str per line on the token-by-token hot path.
+            buf = bytearray()
+            async for chunk in response.aiter_bytes():
+                buf += chunk
+                while (nl := buf.find(b"\n")) >= 0:
+                    line = bytes(buf[:nl]).strip()
+                    del buf[: nl + 1]
+                    if not line:
+                        continue
+                    # First-byte check short-circuits ":" keepalive comments
+                    # before paying for the full 6-byte prefix compare.
+                    if line[:1] != b"d" or line[:6] != b"data: ":
+                        continue
+                    data_str = line[6:]
+                    if data_str == b"[DONE]":
+                        if partials:
+                            yield self._finalize_tool_calls(partials)
+                        return
+                    try:
+                        data = orjson.loads(data_str)
+                        choice = data["choices"][0]
+                        delta = choice["delta"]
+
+                        if not first_token:
+                            LLM_TTFT_SECONDS.labels(
+                                model=model, provider=self.provider_name
+                            ).observe((time.perf_counter_ns() - start) / 1e9)
+                            first_token = True
+
+                        content = delta.get("content")
+
+                        for tc in delta.get("tool_calls") or ():
+                            partial = partials.setdefault(
+                                tc["index"], {"id": None, "name": None, "args": bytearray()}
+                            )
+                            if tc.get("id"):
+                                partial["id"] = tc["id"]
+                            fn = tc.get("function") or {}
+                            if fn.get("name"):
+                                partial["name"] = fn["name"]
+                            if fn.get("arguments"):
+                                partial["args"] += fn["arguments"].encode()
+
+                        if content:
+                            # model_construct: one validated-field pass per
+                            # token adds up over a 1k-token response.
+                            yield StreamChunk.model_construct(content=content)
+
+                        if choice.get("finish_reason") == "tool_calls" and partials:
+                            yield self._finalize_tool_calls(partials)
+                            partials = {}
+
+                    except orjson.JSONDecodeError:
                         continue
-                    if line.startswith("data: "):
-                        data_str = line[6:]
-                        if data_str == "[DONE]":
-                            break
-                        try:
-                            data = json.loads(data_str)
-                            delta = data["choices"][0]["delta"]
-
-                            if not first_token:
-                                LLM_TTFT_SECONDS.labels(
-                                    model=model, provider=self.provider_name
-                                ).observe(time.time() - start_time)
-                                first_token = True
-
-                            content = delta.get("content")
-
-                            # Streaming tool calls is complex, handling simplified version here
-                            # (Accumulating tool calls in the orchestrator is better,
-                            #  but for now we just pass partials if they exist)
-                            tool_calls = None
-                            if delta.get("tool_calls"):
-                                # This logic is tricky for streaming JSON fragments.
-                                # For a robust implementation, we might need a stateful parser.
-                                # For this pass, we'll focus on content streaming.
-                                pass
-
-                            if content:
-                                yield StreamChunk(content=content)
-
-                        except json.JSONDecodeError:
-                            continue
 
     async def health_check(self) -> bool:
         if not self.api_key:
             return False
         try:
-            async with httpx.AsyncClient() as client:
-                # Check models endpoint
-                resp = await client.get(f"{self.base_url}/models", headers=self._get_headers())
-                return resp.status_code == 200
-        except:
+            client = await self._get_client()
+            # Check models endpoint
+            resp = await client.get("/models")
+            return resp.status_code == 200
+        except Exception:
             return False
 
     def get_available_models(self) -> List[str]:
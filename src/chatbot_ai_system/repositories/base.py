@@ -1,7 +1,7 @@
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import AsyncGenerator, Dict, Generic, List, Optional, Type, TypeVar
 from uuid import UUID
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from chatbot_ai_system.database.models import Base
@@ -17,10 +17,26 @@ class BaseRepository(Generic[T]):
         self.model_cls = model_cls
 
     async def get(self, id: UUID) -> Optional[T]:
-        """Get a record by ID."""
-        statement = select(self.model_cls).where(self.model_cls.id == id)
+        """Get a record by ID.
+
+        Session.get consults the session's identity map first, so repeated
+        lookups of the same row within one request (auth check, then
+        summary read, then append) cost a single SELECT instead of one
+        round trip per call.
+        """
+        return await self.session.get(self.model_cls, id)
+
+    async def get_many(self, ids: List[UUID]) -> Dict[UUID, T]:
+        """Fetch several records by ID in one statement.
+
+        Collapses N point-lookups into a single WHERE id IN (...) query;
+        callers index the returned mapping instead of looping over get().
+        """
+        if not ids:
+            return {}
+        statement = select(self.model_cls).where(self.model_cls.id.in_(ids))
         result = await self.session.execute(statement)
-        return result.scalar_one_or_none()
+        return {row.id: row for row in result.scalars()}
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
         """Get all records with pagination."""
@@ -28,13 +44,28 @@ class BaseRepository(Generic[T]):
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    async def iter_all(self, batch: int = 500) -> AsyncGenerator[T, None]:
+        """Stream all records with a server-side cursor.
+
+        get_all materializes every row at once; for table-wide scans
+        (embedding backfill, migrations) this keeps memory at O(batch)
+        by letting the driver fetch rows as they are consumed.
+        """
+        statement = select(self.model_cls).execution_options(yield_per=batch)
+        result = await self.session.stream(statement)
+        async for row in result.scalars():
+            yield row
+
     async def create(self, **kwargs) -> T:
-        """Create a new record."""
-        instance = self.model_cls(**kwargs)
-        self.session.add(instance)
-        await self.session.flush()  # Flush to get ID, but don't commit yet
-        await self.session.refresh(instance)
-        return instance
+        """Create a new record.
+
+        Uses INSERT ... RETURNING so server defaults come back with the
+        insert itself — add/flush/refresh would issue a second SELECT
+        round trip just to reload them.
+        """
+        statement = insert(self.model_cls).values(**kwargs).returning(self.model_cls)
+        result = await self.session.execute(statement)
+        return result.scalar_one()
 
     async def update(self, id: UUID, **kwargs) -> Optional[T]:
         """Update a record by ID."""
@@ -1,27 +1,42 @@
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, insert, select, update
 from sqlalchemy.orm import selectinload
 
 from chatbot_ai_system.database.models import Conversation, Message
+from chatbot_ai_system.database.redis import redis_client
 from chatbot_ai_system.repositories.base import BaseRepository
 
+# Rows per multi-VALUES INSERT; keeps statements under the parameter limit.
+_BULK_INSERT_CHUNK = 500
+
+# Sliding-window cache: the recent-message window is read on every chat
+# turn, so keep the newest _WINDOW_SIZE rows per conversation in Redis.
+# The short TTL bounds staleness if an invalidation is ever missed.
+_WINDOW_SIZE = 50
+_WINDOW_TTL = 60
+
 
 class ConversationRepository(BaseRepository[Conversation]):
     """Repository for Conversation-related operations."""
 
+    # Built once at class level with a bindparam so SQLAlchemy's compiled-
+    # statement cache hits from the first call instead of re-rendering the
+    # select (and its selectinload option) per request.
+    _GET_WITH_MSGS = (
+        select(Conversation)
+        .where(Conversation.id == bindparam("id"))
+        .options(selectinload(Conversation.messages))
+    )
+
     def __init__(self, session):
         super().__init__(session, Conversation)
 
     async def get_conversation_with_messages(self, conversation_id: UUID) -> Optional[Conversation]:
         """Get conversation with all messages loaded."""
-        statement = (
-            select(Conversation)
-            .where(Conversation.id == conversation_id)
-            .options(selectinload(Conversation.messages))
-        )
-        result = await self.session.execute(statement)
+        result = await self.session.execute(self._GET_WITH_MSGS, {"id": conversation_id})
         return result.scalar_one_or_none()
 
     async def create_conversation(self, user_id: UUID, title: Optional[str] = None) -> Conversation:
@@ -33,7 +48,7 @@ class ConversationRepository(BaseRepository[Conversation]):
         conversation_id: UUID,
         role: str,
         content: str,
-        sequence_number: int,
+        sequence_number: Optional[int] = None,
         tool_calls: Optional[List[Dict[str, Any]]] = None,
         tool_call_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
@@ -44,26 +59,108 @@ class ConversationRepository(BaseRepository[Conversation]):
         latency_ms: Optional[int] = None,
         finish_reason: Optional[str] = None,
     ) -> Message:
-        """Add a message to a conversation."""
-        message = Message(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            sequence_number=sequence_number,
-            tool_calls=tool_calls,
-            tool_call_id=tool_call_id,
-            metadata_=metadata,
-            token_count_prompt=token_count_prompt,
-            token_count_completion=token_count_completion,
-            model=model,
-            latency_ms=latency_ms,
-            finish_reason=finish_reason,
-        )
-        self.session.add(message)
-        await self.session.flush()
-        await self.session.refresh(message)
+        """Add a message to a conversation.
+
+        Single INSERT ... RETURNING round trip; see BaseRepository.create.
+
+        When sequence_number is omitted, the conversation's next_seq_id
+        counter is bumped atomically in the same statement (UPDATE CTE
+        feeding the INSERT), so callers don't need to read the current
+        max(sequence_number) first and concurrent writers can't race.
+        """
+        values: Dict[str, Any] = {
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "tool_calls": tool_calls,
+            "tool_call_id": tool_call_id,
+            "metadata_": metadata,
+            "token_count_prompt": token_count_prompt,
+            "token_count_completion": token_count_completion,
+            "model": model,
+            "latency_ms": latency_ms,
+            "finish_reason": finish_reason,
+        }
+        if sequence_number is None:
+            seq_cte = (
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(next_seq_id=Conversation.next_seq_id + 1)
+                .returning(Conversation.next_seq_id)
+                .cte("next_seq")
+            )
+            values["sequence_number"] = select(seq_cte.c.next_seq_id).scalar_subquery()
+        else:
+            values["sequence_number"] = sequence_number
+            # Keep the counter consistent with explicitly numbered inserts.
+            await self.session.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(next_seq_id=func.greatest(Conversation.next_seq_id, sequence_number))
+            )
+
+        statement = insert(Message).values(**values).returning(Message)
+        result = await self.session.execute(statement)
+        message = result.scalar_one()
+        await redis_client.delete(self._window_key(conversation_id))
         return message
 
+    async def add_messages(self, conversation_id: UUID, rows: List[Dict[str, Any]]) -> List[UUID]:
+        """Bulk-insert messages for a conversation in a few round trips.
+
+        Each entry in ``rows`` holds Message column values (role, content,
+        sequence_number, ...). Executing one insert() with a list of
+        parameter dicts hits SQLAlchemy's insertmanyvalues fast path, so N
+        rows cost a handful of multi-VALUES statements instead of N
+        flush+refresh round trips.
+
+        Returns:
+            IDs of the inserted messages, in input order.
+        """
+        stmt = insert(Message).returning(Message.id)
+        ids: List[UUID] = []
+        for start in range(0, len(rows), _BULK_INSERT_CHUNK):
+            chunk = [
+                {"conversation_id": conversation_id, **row}
+                for row in rows[start : start + _BULK_INSERT_CHUNK]
+            ]
+            result = await self.session.execute(stmt, chunk)
+            ids.extend(result.scalars().all())
+        await redis_client.delete(self._window_key(conversation_id))
+        return ids
+
+    @staticmethod
+    def _window_key(conversation_id: UUID) -> str:
+        return f"conv:{conversation_id}:window:{_WINDOW_SIZE}"
+
+    @staticmethod
+    def _message_to_row(message: Message) -> Dict[str, Any]:
+        """Serialize a Message for the Redis window cache."""
+        return {
+            "id": str(message.id),
+            "conversation_id": str(message.conversation_id),
+            "role": message.role,
+            "content": message.content,
+            "tool_calls": message.tool_calls,
+            "tool_call_id": message.tool_call_id,
+            "sequence_number": message.sequence_number,
+            "created_at": message.created_at.isoformat() if message.created_at else None,
+        }
+
+    @staticmethod
+    def _message_from_row(row: Dict[str, Any]) -> Message:
+        """Rebuild a detached Message from a cached row (read-only use)."""
+        return Message(
+            id=UUID(row["id"]),
+            conversation_id=UUID(row["conversation_id"]),
+            role=row["role"],
+            content=row["content"],
+            tool_calls=row["tool_calls"],
+            tool_call_id=row["tool_call_id"],
+            sequence_number=row["sequence_number"],
+            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
+        )
+
     async def get_user_conversations(self, user_id: UUID, limit: int = 50) -> List[Conversation]:
         """Get all conversations for a user, ordered by update time."""
         statement = (
@@ -75,56 +172,143 @@ class ConversationRepository(BaseRepository[Conversation]):
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    async def get_user_conversations_with_counts(
+        self, user_id: UUID, limit: int = 50
+    ) -> List[tuple]:
+        """Get a user's conversations with their message counts in one query.
+
+        Listing conversations and then touching messages per row is the
+        classic N+1; a grouped outer join returns (Conversation, count)
+        pairs in a single round trip.
+        """
+        statement = (
+            select(Conversation, func.count(Message.id))
+            .outerjoin(Message)
+            .where(Conversation.user_id == user_id)
+            .group_by(Conversation.id)
+            .order_by(Conversation.updated_at.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(statement)
+        return list(result.all())
+
     async def get_recent_messages(self, conversation_id: UUID, limit: int = 50) -> List[Message]:
-        """Get the most recent messages for a conversation (Sliding Window)."""
+        """Get the most recent messages for a conversation (Sliding Window).
+
+        The window is read on every chat turn, so it is cached in Redis
+        (up to _WINDOW_SIZE rows) and invalidated by add_message /
+        add_messages. Cached rows come back as detached, read-only Message
+        objects — fine for rendering history, not for mutation.
+        """
+        use_cache = limit <= _WINDOW_SIZE
+        if use_cache:
+            cached = await redis_client.get(self._window_key(conversation_id))
+            if cached is not None:
+                rows = cached[-limit:] if limit < len(cached) else cached
+                return [self._message_from_row(row) for row in rows]
+
         # Fetch in descending order (newest first) to get the "tail", then reverse.
         statement = (
             select(Message)
             .where(Message.conversation_id == conversation_id)
             .order_by(Message.sequence_number.desc())
+            .limit(max(limit, _WINDOW_SIZE) if use_cache else limit)
+        )
+        result = await self.session.execute(statement)
+        messages = list(reversed(result.scalars().all()))
+
+        if use_cache:
+            await redis_client.set(
+                self._window_key(conversation_id),
+                [self._message_to_row(m) for m in messages],
+                ttl=_WINDOW_TTL,
+            )
+            if limit < len(messages):
+                messages = messages[-limit:]
+        return messages
+
+    async def get_messages_before(
+        self, conversation_id: UUID, cursor_seq: int, limit: int = 50
+    ) -> List[Message]:
+        """Keyset-paginate older messages, newest first.
+
+        Scrolling history with OFFSET would scan and discard O(offset)
+        rows per page; anchoring on the last-seen sequence_number keeps
+        every page an index range scan.
+        """
+        statement = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .where(Message.sequence_number < cursor_seq)
+            .order_by(Message.sequence_number.desc())
             .limit(limit)
         )
         result = await self.session.execute(statement)
-        messages = result.scalars().all()
-        return list(reversed(messages))
+        return list(result.scalars().all())
 
     async def update_summary(self, conversation_id: UUID, summary: str, last_seq_id: int) -> None:
-        """Update the conversation summary and the last summarized sequence ID."""
-        conv = await self.get(conversation_id)
-        if conv:
-            conv.summary = summary
-            conv.last_summarized_seq_id = last_seq_id
-            await self.session.flush()
+        """Update the conversation summary and the last summarized sequence ID.
+
+        Single UPDATE; no need to load the row just to set two columns.
+        """
+        statement = (
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(summary=summary, last_summarized_seq_id=last_seq_id)
+        )
+        await self.session.execute(statement)
 
     async def get_conversation_summary(self, conversation_id: UUID) -> Optional[dict]:
-        """Get the summary and last summarized sequence ID."""
-        statement = select(Conversation).where(Conversation.id == conversation_id)
-        result = await self.session.execute(statement)
-        conv = result.scalar_one_or_none()
+        """Get the summary and last summarized sequence ID.
+
+        Goes through get() so a conversation already loaded earlier in the
+        request is served from the session identity map without SQL.
+        """
+        conv = await self.get(conversation_id)
         if conv:
             return {"summary": conv.summary, "last_summarized_seq_id": conv.last_summarized_seq_id}
         return None
 
     async def update_message_embedding(self, message_id: UUID, embedding: List[float]) -> None:
-        """Update a message with its vector embedding."""
-        statement = select(Message).where(Message.id == message_id)
-        result = await self.session.execute(statement)
-        message = result.scalar_one_or_none()
-        if message:
-            message.embedding = embedding
-            await self.session.flush()
+        """Update a message with its vector embedding (single UPDATE)."""
+        statement = update(Message).where(Message.id == message_id).values(embedding=embedding)
+        await self.session.execute(statement)
+
+    async def update_message_embeddings(self, pairs: List[tuple]) -> None:
+        """Bulk-update embeddings for many messages.
+
+        Args:
+            pairs: (message_id, embedding) tuples. Passed as executemany
+                params so the driver pipelines the UPDATEs — the shape
+                backfill jobs need when embedding thousands of messages.
+        """
+        if not pairs:
+            return
+        statement = (
+            update(Message)
+            .where(Message.id == bindparam("b_id"))
+            .values(embedding=bindparam("b_embedding"))
+        )
+        await self.session.execute(
+            statement,
+            [{"b_id": message_id, "b_embedding": embedding} for message_id, embedding in pairs],
+        )
 
     async def search_similar_messages(
         self, user_id: UUID, query_embedding: List[float], limit: int = 5, threshold: float = 0.7
     ) -> List[Message]:
         """Perform semantic search across all of a user's conversations."""
-        # Note: We join with Conversation to ensure we filter by the correct user_id
+        # Note: We join with Conversation to ensure we filter by the correct user_id.
+        # A single labeled distance expression is shared between WHERE and
+        # ORDER BY so pgvector computes it once per row and the ORDER BY can
+        # use the HNSW index (ix_messages_embedding_hnsw) for ANN pruning.
+        dist = Message.embedding.cosine_distance(query_embedding).label("dist")
         statement = (
-            select(Message)
+            select(Message, dist)
             .join(Conversation)
             .where(Conversation.user_id == user_id)
-            .where(Message.embedding.cosine_distance(query_embedding) < (1 - threshold))
-            .order_by(Message.embedding.cosine_distance(query_embedding))
+            .where(dist < (1 - threshold))
+            .order_by(dist)
             .limit(limit)
         )
         result = await self.session.execute(statement)
@@ -1,6 +1,8 @@
 """Main FastAPI application."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,6 +11,7 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from chatbot_ai_system import __version__
 from chatbot_ai_system.config import get_settings
 from chatbot_ai_system.database.redis import redis_client
+from chatbot_ai_system.providers.factory import ProviderFactory
 
 from .multimodal_routes import router as multimodal_router
 from .routes import router
@@ -21,6 +24,98 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown lifecycle (replaces the deprecated on_event hooks)."""
+    settings = get_settings()
+    logger.info(f"Starting Chatbot AI System v{__version__}")
+    logger.info(f"Debug mode: {settings.debug}")
+    logger.info(f"Default LLM provider: {settings.default_llm_provider}")
+
+    # Initialize Redis
+    await redis_client.connect(settings.redis_url)
+
+    # Construct the default provider eagerly. get_provider is synchronous
+    # (no await between the cache check and the write), so lazy init was
+    # never a race — but it did put client construction on the first
+    # request's latency. Do it here instead.
+    try:
+        provider = ProviderFactory.get_provider(settings.default_llm_provider)
+        # Two parallel pings leave live keepalive sockets in the client's
+        # pool, hiding TCP/HTTP setup from the first user requests.
+        await asyncio.gather(provider.health_check(), provider.health_check())
+    except Exception as e:
+        logger.warning(f"Provider warmup failed (continuing): {e}")
+
+    # Warm the DB pool so the first request doesn't pay connection setup
+    try:
+        from sqlalchemy import text
+
+        from chatbot_ai_system.database.session import engine
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"DB pool warmup failed (continuing): {e}")
+
+    # Initialize and register MCP clients
+    import os
+
+    from chatbot_ai_system.config.mcp_server_config import get_mcp_servers
+    from chatbot_ai_system.tools import registry
+    from chatbot_ai_system.tools.mcp_client import MCPClient
+
+    # Load MCP servers from configuration
+    servers = get_mcp_servers()
+    logger.info(f"Loading {len(servers)} MCP servers...")
+
+    clients = []
+    for server_config in servers:
+        try:
+            # Check for required env vars again (safety check)
+            missing_vars = [
+                var
+                for var in server_config.required_env_vars
+                if not server_config.env_vars.get(var) and not os.environ.get(var)
+            ]
+            if missing_vars:
+                logger.warning(
+                    f"Skipping MCP server {server_config.name}: Missing required environment variables: {', '.join(missing_vars)}"
+                )
+                continue
+
+            clients.append(
+                MCPClient(
+                    name=server_config.name,
+                    command=server_config.command,
+                    args=server_config.args,
+                    env=server_config.env_vars or os.environ.copy(),
+                )
+            )
+            logger.info(f"Registered MCP server: {server_config.name}")
+        except Exception as e:
+            logger.error(f"Failed to register MCP server {server_config.name}: {e}")
+    registry.register_many(clients)
+
+    # Refresh tools; the registry fans out to the clients concurrently,
+    # so startup pays for the slowest server spawn rather than the sum.
+    try:
+        await registry.refresh_remote_tools()
+        logger.info("MCP servers registered and tools refreshed")
+    except Exception as e:
+        logger.error(f"Error refreshing MCP tools: {e}")
+
+    yield
+
+    logger.info("Shutting down Chatbot AI System")
+
+    # Cleanup providers
+    await ProviderFactory.shutdown_all()
+
+    # Close Redis
+    await redis_client.close()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
@@ -31,6 +126,7 @@ def create_app() -> FastAPI:
         version=__version__,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # Configure CORS
@@ -46,80 +142,14 @@ def create_app() -> FastAPI:
     app.include_router(router)
     app.include_router(multimodal_router)  # Phase 5.0: Upload, Voice
 
-    # Initialize Prometheus Instrumentation
-    Instrumentator().instrument(app).expose(app)
-
-    @app.on_event("startup")
-    async def startup_event():
-        logger.info(f"Starting Chatbot AI System v{__version__}")
-        logger.info(f"Debug mode: {settings.debug}")
-        logger.info(f"Default LLM provider: {settings.default_llm_provider}")
-
-        # Initialize Redis
-        await redis_client.connect(settings.redis_url)
-
-        # Initialize and register MCP clients
-        import os
-
-        from chatbot_ai_system.config.mcp_server_config import get_mcp_servers
-        from chatbot_ai_system.tools import registry
-        from chatbot_ai_system.tools.mcp_client import MCPClient
-
-        # Load MCP servers from configuration
-        servers = get_mcp_servers()
-        logger.info(f"Loading {len(servers)} MCP servers...")
-
-        for server_config in servers:
-            try:
-                # Check for required env vars again (safety check)
-                missing_vars = [
-                    var
-                    for var in server_config.required_env_vars
-                    if not server_config.env_vars.get(var) and not os.environ.get(var)
-                ]
-                if missing_vars:
-                    logger.warning(
-                        f"Skipping MCP server {server_config.name}: Missing required environment variables: {', '.join(missing_vars)}"
-                    )
-                    continue
-
-                client = MCPClient(
-                    name=server_config.name,
-                    command=server_config.command,
-                    args=server_config.args,
-                    env=server_config.env_vars or os.environ.copy(),
-                )
-                registry.register_mcp_client(client)
-                logger.info(f"Registered MCP server: {server_config.name}")
-            except Exception as e:
-                logger.error(f"Failed to register MCP server {server_config.name}: {e}")
-
-        # Refresh tools
-        try:
-            await registry.refresh_remote_tools()
-            logger.info("MCP servers registered and tools refreshed")
-        except Exception as e:
-            logger.error(f"Error refreshing MCP tools: {e}")
-
-    @app.on_event("shutdown")
-    async def shutdown_event():
-        logger.info("Shutting down Chatbot AI System")
-
-        # Cleanup MCP clients
-        # (The registry or clients should ideally handle this, but for now we rely on process termination
-        # or we could add a cleanup method to registry)
-        # We might want to explicitly close them if we had a reference, but they are in the registry's list.
-        # Ideally, we'd add a close_all method to registry.
-
-        # Cleanup providers
-        from .routes import _providers
-
-        for provider in _providers.values():
-            if hasattr(provider, "close"):
-                await provider.close()
-
-        # Close Redis
-        await redis_client.close()
+    # Initialize Prometheus Instrumentation. Grouped status codes and
+    # untemplated-path filtering keep label cardinality (and the per-request
+    # labels() cost) down; scrape endpoints are excluded from self-metrics.
+    Instrumentator(
+        should_group_status_codes=True,
+        should_ignore_untemplated=True,
+        excluded_handlers=["/metrics", "/health"],
+    ).instrument(app).expose(app, include_in_schema=False)
 
     return app
 
@@ -7,11 +7,15 @@ Provides:
 - WebSocket /api/voice/stream — Real-time voice conversation
 """
 
-import io
+import array
+import asyncio
 import logging
+import re
 import uuid
 from typing import Optional
 
+import orjson
+
 from fastapi import (
     APIRouter,
     File,
@@ -20,6 +24,7 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel
 
 from chatbot_ai_system.config import get_settings
@@ -27,12 +32,76 @@ from chatbot_ai_system.models.schemas import (
     ChatMessage,
     MessageRole,
 )
+from chatbot_ai_system.providers.factory import ProviderFactory
 from chatbot_ai_system.services.media_pipeline import MediaPipeline
 from chatbot_ai_system.services.stt_engine import STTEngine
 from chatbot_ai_system.services.tts_engine import TTSEngine
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+# orjson-backed responses, matching the chat router; explicit FileResponse
+# returns (media downloads) are unaffected by the default.
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Images below this size are inlined as base64 in the upload response;
+# larger ones return only file_path (fetchable via /api/media) to avoid
+# the 33% base64 inflation on multi-MB payloads.
+_INLINE_IMAGE_MAX_BYTES = 262144
+
+# Validated once at import; the voice system prompt never changes, so
+# re-running Pydantic validation on it every turn is pure waste. Treated
+# as immutable — never mutate, copy if that ever changes.
+_VOICE_SYSTEM_MSG = ChatMessage(
+    role=MessageRole.SYSTEM,
+    content=(
+        "You are a helpful voice assistant. "
+        "Keep responses concise and conversational. "
+        "Respond in 1-3 sentences."
+    ),
+)
+
+# Constant control frames, encoded once — these sit on the voice turn's
+# latency path, so skip re-serializing them per message. Control frames
+# must go out as text: the voice client routes string frames to the JSON
+# handler and binary frames to the WAV audio buffer.
+_PONG_FRAME = orjson.dumps({"type": "pong"}).decode()
+_RESPONSE_START_FRAME = orjson.dumps({"type": "response_start"}).decode()
+_RESPONSE_END_FRAME = orjson.dumps({"type": "response_end"}).decode()
+
+# Sentence boundaries for incremental TTS dispatch
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_AUDIO_CHUNK_SIZE = 65536
+
+
+async def _send_wav(websocket: WebSocket, audio: bytes) -> None:
+    """Chunk-send a WAV payload (64KB frames).
+
+    Slicing a memoryview is pointer arithmetic, so a multi-MB payload
+    goes out without one bytes copy per chunk (ASGI servers accept
+    bytes-like frames).
+    """
+    mv = memoryview(audio)
+    for i in range(0, len(mv), _AUDIO_CHUNK_SIZE):
+        await websocket.send_bytes(mv[i : i + _AUDIO_CHUNK_SIZE])
+
+
+async def _drain_tts_queue(websocket: WebSocket, queue: "asyncio.Queue") -> None:
+    """Ship synthesized audio in sentence order as each synth finishes.
+
+    The queue holds in-flight synthesize tasks (or None as a sentinel);
+    awaiting them in enqueue order keeps playback ordered while later
+    sentences synthesize in the background.
+    """
+    while True:
+        task = await queue.get()
+        if task is None:
+            return
+        try:
+            audio = await task
+        except Exception as e:
+            logger.error(f"TTS failed: {e}")
+            continue
+        if audio:
+            await _send_wav(websocket, audio)
 
 # Lazy singletons
 _media_pipeline: Optional[MediaPipeline] = None
@@ -119,11 +188,12 @@ async def upload_media(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=str(e))
 
     # Process based on type
-    upload_id = str(uuid.uuid4())
+    upload_id = uuid.uuid4().hex
 
     try:
         if file_type == "image":
             result = await pipeline.process_image(file_bytes, filename, content_type)
+            inline = result["file_size_bytes"] < _INLINE_IMAGE_MAX_BYTES
             return UploadResponse(
                 id=upload_id,
                 type="image",
@@ -131,7 +201,7 @@ async def upload_media(file: UploadFile = File(...)):
                 mime_type=content_type,
                 file_path=result["file_path"],
                 file_size_bytes=result["file_size_bytes"],
-                base64_data=result["base64_data"],
+                base64_data=result["base64_data"] if inline else None,
                 width=result["width"],
                 height=result["height"],
             )
@@ -172,6 +242,31 @@ async def upload_media(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 
+# ─── Media Fetch Endpoint ───────────────────────────────────────
+
+
+@router.get("/api/media/{category}/{filename}")
+async def get_media(category: str, filename: str):
+    """
+    Stream a stored media file from local storage.
+
+    Large images skip inline base64 in the upload response; clients (and
+    the vision-model caller) fetch the bytes from here instead.
+    """
+    if category not in ("images", "audio", "video"):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    pipeline = get_media_pipeline()
+    storage_root = pipeline.storage_path.resolve()
+    path = (storage_root / category / filename).resolve()
+
+    # Guard against path traversal in `filename`
+    if storage_root not in path.parents or not path.is_file():
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    return FileResponse(path)
+
+
 # ─── Voice Config Endpoint ──────────────────────────────────────
 
 
@@ -191,6 +286,146 @@ async def voice_config():
 # ─── Voice WebSocket ────────────────────────────────────────────
 
 
+# ─── Server-side VAD ────────────────────────────────────────────
+
+_VAD_FRAME_BYTES = 640  # 20ms at 16kHz, 16-bit mono PCM
+_VAD_RMS_THRESHOLD = 500  # Energy floor separating speech from mic noise
+_VAD_TRAILING_SILENCE_FRAMES = 25  # 500ms of silence ends the turn
+
+
+def _is_speech_frame(frame: bytes) -> bool:
+    """Energy-based voice activity check for one 20ms PCM frame."""
+    samples = array.array("h", frame)
+    if not samples:
+        return False
+    energy = sum(x * x for x in samples) / len(samples)
+    return energy > _VAD_RMS_THRESHOLD * _VAD_RMS_THRESHOLD
+
+
+def _trim_silence(audio: bytes) -> bytes:
+    """Drop silent lead-in/tail frames before STT.
+
+    Whisper cost scales with audio length and buffered turns routinely
+    start and end with dead air, so trimming it cuts transcription
+    latency without touching the speech itself.
+    """
+    first = last = None
+    for off in range(0, len(audio) - _VAD_FRAME_BYTES + 1, _VAD_FRAME_BYTES):
+        if _is_speech_frame(audio[off : off + _VAD_FRAME_BYTES]):
+            if first is None:
+                first = off
+            last = off
+    if first is None:
+        return b""
+    return audio[first : last + _VAD_FRAME_BYTES]
+
+
+async def _run_turn(websocket: WebSocket, stt: STTEngine, tts: TTSEngine, audio_bytes: bytes):
+    """Process one utterance: STT, then pipelined LLM + TTS response."""
+    # Step 1: STT
+    try:
+        stt_result = await stt.transcribe(audio_bytes)
+        transcription = stt_result["text"]
+
+        await websocket.send_text(
+            orjson.dumps(
+                {
+                    "type": "transcription",
+                    "text": transcription,
+                    "language": stt_result["language"],
+                }
+            ).decode()
+        )
+    except Exception as e:
+        logger.error(f"STT failed: {e}")
+        await websocket.send_text(
+            orjson.dumps(
+                {
+                    "type": "error",
+                    "message": f"Speech recognition failed: {str(e)}",
+                }
+            ).decode()
+        )
+        return
+
+    if not transcription.strip():
+        return
+
+    # Step 2: Get LLM response
+    provider = ProviderFactory.get_provider("ollama")
+    settings = get_settings()
+
+    try:
+        await websocket.send_text(_RESPONSE_START_FRAME)
+
+        # Steps 2+3 pipelined: each completed sentence is dispatched to
+        # TTS while the model keeps decoding, and a consumer task ships
+        # finished audio in order. First audio reaches the client after
+        # one sentence rather than after the full response + full synth.
+        tts_queue: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(_drain_tts_queue(websocket, tts_queue))
+
+        response_parts = []
+        sentence_buf = ""
+        try:
+            async for token in provider.stream_text(
+                messages=[
+                    _VOICE_SYSTEM_MSG,
+                    ChatMessage.model_construct(
+                        role=MessageRole.USER,
+                        content=transcription,
+                    ),
+                ],
+                model=settings.ollama_model,
+                temperature=0.7,
+                max_tokens=200,
+            ):
+                response_parts.append(token)
+                await websocket.send_text(
+                    orjson.dumps({"type": "response_text_delta", "text": token}).decode()
+                )
+
+                if tts.is_available:
+                    sentence_buf += token
+                    *done, sentence_buf = _SENTENCE_SPLIT_RE.split(sentence_buf)
+                    for sentence in done:
+                        if sentence.strip():
+                            tts_queue.put_nowait(
+                                asyncio.create_task(tts.synthesize(sentence))
+                            )
+
+            if tts.is_available and sentence_buf.strip():
+                tts_queue.put_nowait(asyncio.create_task(tts.synthesize(sentence_buf)))
+        finally:
+            tts_queue.put_nowait(None)
+            await sender
+
+        response_text = "".join(response_parts)
+
+        # Full text once more for clients that don't reassemble deltas
+        await websocket.send_text(
+            orjson.dumps(
+                {
+                    "type": "response_text",
+                    "text": response_text,
+                }
+            ).decode()
+        )
+
+        await websocket.send_text(_RESPONSE_END_FRAME)
+
+    except Exception as e:
+        logger.error(f"LLM response failed: {e}")
+        await websocket.send_text(
+            orjson.dumps(
+                {
+                    "type": "error",
+                    "message": f"Response generation failed: {str(e)}",
+                }
+            ).decode()
+        )
+
+
 @router.websocket("/api/voice/stream")
 async def voice_stream(websocket: WebSocket):
     """
@@ -201,131 +436,65 @@ async def voice_stream(websocket: WebSocket):
     - Client sends: JSON control messages {"type": "end_turn"}
     - Server sends: JSON {"type": "transcription", "text": "..."}
     - Server sends: JSON {"type": "response_start"}
+    - Server sends: JSON {"type": "response_text_delta", "text": "..."}
+    - Server sends: Binary audio response chunks (WAV), interleaved
     - Server sends: JSON {"type": "response_text", "text": "..."}
-    - Server sends: Binary audio response chunks (WAV)
     - Server sends: JSON {"type": "response_end"}
+
+    A server-side VAD also ends the turn automatically after ~500ms of
+    trailing silence, so responses start without waiting for the
+    client's end_turn signal.
     """
     await websocket.accept()
     logger.info("Voice WebSocket connected")
 
     stt = get_stt_engine()
     tts = get_tts_engine()
-    audio_buffer = io.BytesIO()
+    # Plain bytearray: extend() appends frames in place, clear() resets
+    # without reallocating — cheaper than BytesIO churn per turn.
+    audio_buffer = bytearray()
+    turn_has_speech = False
+    trailing_silence = 0
 
     try:
         while True:
             data = await websocket.receive()
+            process_turn = False
 
             if "bytes" in data:
-                # Binary audio frame from client
-                audio_buffer.write(data["bytes"])
+                frames = data["bytes"]
+                audio_buffer.extend(frames)
+
+                # Server-side VAD bookkeeping per 20ms frame
+                for off in range(0, len(frames) - _VAD_FRAME_BYTES + 1, _VAD_FRAME_BYTES):
+                    if _is_speech_frame(frames[off : off + _VAD_FRAME_BYTES]):
+                        turn_has_speech = True
+                        trailing_silence = 0
+                    else:
+                        trailing_silence += 1
+                process_turn = (
+                    turn_has_speech and trailing_silence >= _VAD_TRAILING_SILENCE_FRAMES
+                )
 
             elif "text" in data:
-                import json
-
-                msg = json.loads(data["text"])
+                msg = orjson.loads(data["text"])
 
                 if msg.get("type") == "end_turn":
-                    # User finished speaking — process the audio
-                    audio_buffer.seek(0)
-                    audio_bytes = audio_buffer.read()
-                    audio_buffer = io.BytesIO()  # Reset buffer
-
-                    if len(audio_bytes) < 1600:  # Too short (~0.1s)
-                        continue
-
-                    # Step 1: STT
-                    try:
-                        stt_result = await stt.transcribe(audio_bytes)
-                        transcription = stt_result["text"]
-
-                        await websocket.send_json(
-                            {
-                                "type": "transcription",
-                                "text": transcription,
-                                "language": stt_result["language"],
-                            }
-                        )
-                    except Exception as e:
-                        logger.error(f"STT failed: {e}")
-                        await websocket.send_json(
-                            {
-                                "type": "error",
-                                "message": f"Speech recognition failed: {str(e)}",
-                            }
-                        )
-                        continue
-
-                    if not transcription.strip():
-                        continue
-
-                    # Step 2: Get LLM response
-                    # Import here to avoid circular deps
-                    from chatbot_ai_system.server.routes import get_provider
-
-                    provider = get_provider("ollama")
-                    settings = get_settings()
-
-                    try:
-                        await websocket.send_json({"type": "response_start"})
-
-                        response = await provider.complete(
-                            messages=[
-                                ChatMessage(
-                                    role=MessageRole.SYSTEM,
-                                    content=(
-                                        "You are a helpful voice assistant. "
-                                        "Keep responses concise and conversational. "
-                                        "Respond in 1-3 sentences."
-                                    ),
-                                ),
-                                ChatMessage(
-                                    role=MessageRole.USER,
-                                    content=transcription,
-                                ),
-                            ],
-                            model=settings.ollama_model,
-                            temperature=0.7,
-                            max_tokens=200,
-                        )
-
-                        response_text = response.message.content
-
-                        # Send text
-                        await websocket.send_json(
-                            {
-                                "type": "response_text",
-                                "text": response_text,
-                            }
-                        )
-
-                        # Step 3: TTS
-                        if tts.is_available and response_text.strip():
-                            try:
-                                audio_response = await tts.synthesize(response_text)
-                                if audio_response:
-                                    # Send audio in chunks (64KB each)
-                                    chunk_size = 65536
-                                    for i in range(0, len(audio_response), chunk_size):
-                                        await websocket.send_bytes(
-                                            audio_response[i : i + chunk_size]
-                                        )
-                            except Exception as e:
-                                logger.error(f"TTS failed: {e}")
-
-                        await websocket.send_json({"type": "response_end"})
-
-                    except Exception as e:
-                        logger.error(f"LLM response failed: {e}")
-                        await websocket.send_json(
-                            {
-                                "type": "error",
-                                "message": f"Response generation failed: {str(e)}",
-                            }
-                        )
-
+                    process_turn = True
                 elif msg.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    await websocket.send_text(_PONG_FRAME)
+
+            if process_turn:
+                # Trim dead air before handing the turn to Whisper
+                audio_bytes = _trim_silence(bytes(audio_buffer))
+                audio_buffer.clear()
+                turn_has_speech = False
+                trailing_silence = 0
+
+                if len(audio_bytes) < 1600:  # Too short (~0.1s)
+                    continue
+
+                await _run_turn(websocket, stt, tts, audio_bytes)
 
     except WebSocketDisconnect:
         logger.info("Voice WebSocket disconnected")
@@ -1,10 +1,15 @@
 """FastAPI server routes for the chatbot API."""
 
+import asyncio
 import logging
 import uuid
 from typing import List
 
+import orjson
+
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from chatbot_ai_system.config import get_settings
@@ -29,8 +34,14 @@ from chatbot_ai_system.tools import registry
 
 logger = logging.getLogger(__name__)
 
-# Create router
-router = APIRouter()
+# Create router. orjson encodes responses (datetimes included) several times
+# faster than the stdlib json used by the default JSONResponse.
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Serializes stream chunks straight to JSON bytes — one chunk goes out per
+# streamed token, and dump_json skips both per-call model dispatch and the
+# intermediate Python dict.
+_STREAM_CHUNK_ADAPTER: TypeAdapter = TypeAdapter(StreamChunk)
 
 
 def get_provider(name: str = "ollama") -> BaseLLMProvider:
@@ -38,6 +49,105 @@ def get_provider(name: str = "ollama") -> BaseLLMProvider:
     return ProviderFactory.get_provider(name)
 
 
+def _is_duplicate_user_message(history: List[ChatMessage], msg: ChatMessage) -> bool:
+    """True if *msg* repeats the latest user message in *history*.
+
+    Constant-time tail comparison — clients only ever resend the message
+    they just submitted, so scanning the whole history is unnecessary.
+    """
+    return bool(history) and (
+        history[-1].role == MessageRole.USER and history[-1].content == msg.content
+    )
+
+
+# Bounds the stream writer queue; puts block (backpressure) beyond this
+_WS_SEND_QUEUE_SIZE = 64
+
+# Sentinel closing the stream writer queue
+_WS_CLOSE = object()
+
+
+def _coalescable(chunk: StreamChunk) -> bool:
+    """True if *chunk* carries only content and can be merged with peers."""
+    return (
+        not chunk.done
+        and chunk.status is None
+        and not chunk.tool_calls
+        and chunk.usage is None
+        and chunk.audio_data is None
+    )
+
+
+async def _stream_writer(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    """Drain *queue* to the socket, coalescing bursts of content chunks.
+
+    Fast models emit tokens quicker than TCP drains them; merging
+    whatever queued up while the previous send was in flight cuts JSON
+    encodes and syscalls per token. Clients still receive ordinary
+    StreamChunk frames — just fewer, each carrying more content.
+    """
+    pending = None
+    while True:
+        item = pending if pending is not None else await queue.get()
+        pending = None
+        if item is _WS_CLOSE:
+            return
+
+        if _coalescable(item):
+            parts = [item.content]
+            while not queue.empty():
+                nxt = queue.get_nowait()
+                if nxt is not _WS_CLOSE and _coalescable(nxt):
+                    parts.append(nxt.content)
+                else:
+                    pending = nxt
+                    break
+            if len(parts) > 1:
+                item = StreamChunk.model_construct(
+                    content="".join(parts),
+                    status=None,
+                    done=False,
+                    tool_calls=None,
+                    conversation_id=item.conversation_id,
+                    usage=None,
+                    audio_data=None,
+                )
+
+        await websocket.send_text(_STREAM_CHUNK_ADAPTER.dump_json(item).decode())
+
+
+async def _put_racing_writer(queue: asyncio.Queue, writer: "asyncio.Task", item) -> bool:
+    """Enqueue *item* for the writer, giving up if the writer exits first.
+
+    A plain ``await queue.put()`` on a full queue deadlocks if the writer
+    dies mid-send — no get() ever frees a slot and nothing cancels the
+    producer. Racing the blocking put against the writer task keeps the
+    producer unblockable from either side. Returns True once the item is
+    enqueued, False if the writer finished first.
+    """
+    try:
+        queue.put_nowait(item)
+        return True
+    except asyncio.QueueFull:
+        put_task = asyncio.create_task(queue.put(item))
+        await asyncio.wait({put_task, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if put_task.done() and not put_task.cancelled():
+            return True
+        put_task.cancel()
+        return False
+
+
+async def _ws_send_json(websocket: WebSocket, payload: dict) -> None:
+    """Send a JSON frame serialized with orjson.
+
+    Starlette's send_json uses the stdlib encoder; the chat stream sends
+    one frame per token, so the faster C serializer pays off here. Frames
+    stay text — the frontend JSON.parses event.data and treats binary
+    frames as something else entirely.
+    """
+    await websocket.send_text(orjson.dumps(payload).decode())
+
+
 # Helper to simulate auth
 def get_current_user_id() -> uuid.UUID:
     """Return a fixed user ID for single-tenant mode."""
@@ -140,9 +250,7 @@ async def chat_completion(request: ChatRequest, db: AsyncSession = Depends(get_d
         raise HTTPException(status_code=400, detail="Last message must be from user")
 
     # Check if duplicate (simple check)
-    if not history or (
-        history[-1].content != last_msg.content or history[-1].role != MessageRole.USER
-    ):
+    if not _is_duplicate_user_message(history, last_msg):
         current_seq = len(history) + 1
         await conv_repo.add_message(
             conversation_id=conversation_id,
@@ -159,8 +267,8 @@ async def chat_completion(request: ChatRequest, db: AsyncSession = Depends(get_d
             provider=provider, registry=registry, conversation_repo=conv_repo, memory_repo=mem_repo
         )
 
-        full_content = ""
-        tool_calls = []
+        content_parts = []
+        tool_call_chunk = None
 
         # Run Orchestrator
         async for chunk in orchestrator.run(
@@ -172,11 +280,18 @@ async def chat_completion(request: ChatRequest, db: AsyncSession = Depends(get_d
             max_tokens=request.max_tokens or 1000,
             user_id=str(user_id),
         ):
-            full_content += chunk.content
+            content_parts.append(chunk.content)
             if chunk.tool_calls:
-                tool_calls.extend(chunk.tool_calls)
+                tool_call_chunk = chunk
+
+        # Join once — repeated str += is quadratic in total response size
+        full_content = "".join(content_parts)
+        # Tool calls ride on a single chunk, so pull them from it after the
+        # loop instead of extending a list per chunk
+        tool_calls = list(tool_call_chunk.tool_calls) if tool_call_chunk else []
 
-        response_msg = ChatMessage(
+        # Internally assembled from validated parts — skip re-validation
+        response_msg = ChatMessage.model_construct(
             role=MessageRole.ASSISTANT,
             content=full_content,
             tool_calls=tool_calls if tool_calls else None,
@@ -213,28 +328,17 @@ async def list_conversations(db: AsyncSession = Depends(get_db)):
     await ensure_user_exists(db, user_id)
 
     conv_repo = ConversationRepository(db)
-    conversations = await conv_repo.get_user_conversations(user_id)
+    # One grouped query returns counts alongside the conversations; touching
+    # conv.messages per row would cost a query per conversation.
+    conversations = await conv_repo.get_user_conversations_with_counts(user_id)
 
     result = []
-    for conv in conversations:
-        # We need to fetch the first message for title/preview?
-        # The repo method `get_user_conversations` currently returns Conversation objects.
-        # Ideally we join with messages or at least get the count/last update.
-        # For efficiency, we might just return the title if set, else "Conversation <Date>"
-        # DB schema has 'title'.
-
-        # We need to load messages to get message_count efficiently or add a counter column.
-        # For now, let's load them (lazy load might fail in async without eager load).
-        # We should update repo to eager load or use separate query.
-        # Let's rely on what we have.
-
-        # A proper implementation would augment the query.
-        # For now, let's just return basic info.
+    for conv, message_count in conversations:
         result.append(
             ConversationInfo(
                 id=str(conv.id),
                 title=conv.title or f"Conversation {conv.created_at.strftime('%Y-%m-%d %H:%M')}",
-                message_count=0,  # TODO: Optimize count query
+                message_count=message_count,
                 created_at=conv.created_at,
                 updated_at=conv.updated_at,
             )
@@ -293,23 +397,17 @@ async def websocket_chat_stream(websocket: WebSocket, db: AsyncSession = Depends
     mem_repo = MemoryRepository(db)
 
     try:
-        while is_connected:
+        # iter_text folds disconnect detection into the iterator protocol —
+        # no per-message try/except dance — and orjson parses the small
+        # request envelopes faster than the stdlib decoder behind
+        # receive_json.
+        async for raw in websocket.iter_text():
             try:
-                data = await websocket.receive_json()
-            except WebSocketDisconnect:
-                is_connected = False
-                break
-            except Exception as e:
-                logger.warning(f"Error receiving message: {e}")
-                is_connected = False
-                break
-
-            try:
-                request = ChatRequest(**data)
+                request = ChatRequest(**orjson.loads(raw))
             except Exception as e:
                 if is_connected:
-                    await websocket.send_json(
-                        ErrorResponse(error="Invalid request", detail=str(e)).model_dump()
+                    await _ws_send_json(
+                        websocket, ErrorResponse(error="Invalid request", detail=str(e)).model_dump(exclude_none=True)
                     )
                 continue
 
@@ -318,8 +416,8 @@ async def websocket_chat_stream(websocket: WebSocket, db: AsyncSession = Depends
                 provider = get_provider(provider_name)
             except ValueError as e:
                 if is_connected:
-                    await websocket.send_json(
-                        ErrorResponse(error="Invalid provider", detail=str(e)).model_dump()
+                    await _ws_send_json(
+                        websocket, ErrorResponse(error="Invalid provider", detail=str(e)).model_dump(exclude_none=True)
                     )
                 continue
 
@@ -357,9 +455,7 @@ async def websocket_chat_stream(websocket: WebSocket, db: AsyncSession = Depends
             user_msg = request.messages[-1]  # Assuming last message is new
 
             # Simple deduplication check in case client resends
-            if not history or (
-                history[-1].content != user_msg.content or history[-1].role != MessageRole.USER
-            ):
+            if not _is_duplicate_user_message(history, user_msg):
                 current_seq = len(history) + 1
                 await conv_repo.add_message(
                     conversation_id=conversation_id,
@@ -380,31 +476,43 @@ async def websocket_chat_stream(websocket: WebSocket, db: AsyncSession = Depends
                     memory_repo=mem_repo,
                 )
 
-                async for chunk in orchestrator.run(
-                    conversation_id=str(conversation_id),
-                    user_input=user_query,
-                    conversation_history=history,
-                    model=request.model or settings.ollama_model,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens or 1000,
-                    user_id=str(user_id),
-                ):
-                    if not is_connected:
-                        break
-
-                    chunk.conversation_id = str(conversation_id)
+                send_queue: asyncio.Queue = asyncio.Queue(maxsize=_WS_SEND_QUEUE_SIZE)
+                writer = asyncio.create_task(_stream_writer(websocket, send_queue))
+
+                try:
+                    async for chunk in orchestrator.run(
+                        conversation_id=str(conversation_id),
+                        user_input=user_query,
+                        conversation_history=history,
+                        model=request.model or settings.ollama_model,
+                        temperature=request.temperature,
+                        max_tokens=request.max_tokens or 1000,
+                        user_id=str(user_id),
+                    ):
+                        if not is_connected or writer.done():
+                            # Writer only exits early when a send failed
+                            is_connected = False
+                            break
+
+                        chunk.conversation_id = str(conversation_id)
+                        if not await _put_racing_writer(send_queue, writer, chunk):
+                            # Writer died mid-send with a full queue
+                            is_connected = False
+                            break
+                finally:
+                    if not writer.done():
+                        await _put_racing_writer(send_queue, writer, _WS_CLOSE)
                     try:
-                        await websocket.send_json(chunk.model_dump())
+                        await writer
                     except Exception:
                         is_connected = False
-                        break
 
                 if is_connected:
                     await db.commit()  # Commit after full response (including assistant messages added by orchestrator)
-                    await websocket.send_json(
-                        StreamChunk(
-                            content="", done=True, conversation_id=str(conversation_id)
-                        ).model_dump()
+                    await websocket.send_text(
+                        _STREAM_CHUNK_ADAPTER.dump_json(
+                            StreamChunk(content="", done=True, conversation_id=str(conversation_id))
+                        ).decode()
                     )
 
             except Exception as e:
@@ -413,8 +521,8 @@ async def websocket_chat_stream(websocket: WebSocket, db: AsyncSession = Depends
 
                 traceback.print_exc()
                 if is_connected:
-                    await websocket.send_json(
-                        ErrorResponse(error="Streaming failed", detail=str(e)).model_dump()
+                    await _ws_send_json(
+                        websocket, ErrorResponse(error="Streaming failed", detail=str(e)).model_dump(exclude_none=True)
                     )
 
     except WebSocketDisconnect:
@@ -9,6 +9,7 @@ Plan + ReAct hybrid for complex multi-step tasks.
 """
 
 import logging
+import re
 import time
 from typing import Any, AsyncGenerator, Dict, List, Tuple
 
@@ -26,6 +27,19 @@ MAX_AGENT_ROUNDS = 8  # Safety cap on total tool rounds
 AGENT_TIMEOUT_SEC = 300  # Hard timeout for entire agentic flow
 MAX_TOOLS_AGENTIC = 8  # Tool count cap (slightly higher than one-shot's 5)
 
+# Short queries with none of these hints are near-certain GENERAL/SIMPLE, so
+# the classifier round trip can be skipped entirely. The word list covers the
+# tool categories (git/filesystem/fetch) plus the multi-step signals the LLM
+# classifier looks for; a false positive only means we fall back to the LLM.
+_TOOL_HINT_RE = re.compile(
+    r"\b(file|files|path|folder|directory|directories|git|commit|branch|diff|blame|"
+    r"repo|http|https|url|web|search|fetch|download|browse|internet|online|"
+    r"read|write|list|ls|cat|grep|find|run|execute|script|"
+    r"compare|analyze|debug|investigate|research|then|after)\b",
+    re.IGNORECASE,
+)
+_HEURISTIC_MAX_QUERY_LEN = 120  # chars; longer queries go to the LLM classifier
+
 
 class AgenticEngine:
     """
@@ -68,6 +82,12 @@ class AgenticEngine:
         if has_media:
             return ("GENERAL", "SIMPLE")
 
+        # Heuristic fast path: short queries without any tool/multi-step
+        # hints ("hi", "what is a decorator?") don't need an LLM round trip.
+        if len(user_input) <= _HEURISTIC_MAX_QUERY_LEN and not _TOOL_HINT_RE.search(user_input):
+            logger.info("Classifier skipped via heuristic: GENERAL/SIMPLE")
+            return ("GENERAL", "SIMPLE")
+
         # Dynamic Category Discovery
         all_categories = self.registry.get_categories()
 
@@ -116,8 +136,8 @@ class AgenticEngine:
         )
 
         messages = [
-            ChatMessage(role=MessageRole.SYSTEM, content=classifier_prompt),
-            ChatMessage(role=MessageRole.USER, content=user_input),
+            ChatMessage.model_construct(role=MessageRole.SYSTEM, content=classifier_prompt),
+            ChatMessage.model_construct(role=MessageRole.USER, content=user_input),
         ]
 
         response = await self.provider.complete(
@@ -171,7 +191,7 @@ class AgenticEngine:
                     pass
 
         logger.info(
-            f"Phase 5.5 classifier: intent={intent}, complexity={complexity} (raw: {text!r})"
+            "Phase 5.5 classifier: intent=%s, complexity=%s (raw: %r)", intent, complexity, text
         )
         return (intent, complexity)
 
@@ -216,8 +236,8 @@ class AgenticEngine:
         )
 
         messages = [
-            ChatMessage(role=MessageRole.SYSTEM, content=planner_prompt),
-            ChatMessage(role=MessageRole.USER, content=user_input),
+            ChatMessage.model_construct(role=MessageRole.SYSTEM, content=planner_prompt),
+            ChatMessage.model_construct(role=MessageRole.USER, content=user_input),
         ]
 
         response = await self.provider.complete(
@@ -247,7 +267,7 @@ class AgenticEngine:
         if not steps:
             steps = ["Analyze the request and provide a comprehensive answer"]
 
-        logger.info(f"Phase 5.5 planner: {len(steps)} steps — {steps}")
+        logger.info("Phase 5.5 planner: %d steps — %s", len(steps), steps)
         return steps
 
     # ------------------------------------------------------------------ #
@@ -360,7 +380,7 @@ class AgenticEngine:
             if len(expanded) >= MAX_TOOLS_AGENTIC:
                 break
 
-        logger.info(f"Phase 5.5 tool expansion: {len(current_tools)} → {len(expanded)} tools")
+        logger.info("Phase 5.5 tool expansion: %d → %d tools", len(current_tools), len(expanded))
         return expanded[:MAX_TOOLS_AGENTIC]
 
     # ------------------------------------------------------------------ #
@@ -398,18 +418,22 @@ class AgenticEngine:
         # Build agentic system prompt
         agentic_prompt = self._get_agentic_system_prompt(plan, tools)
 
-        # Inject/replace system message
+        # Inject/replace system message — rebuilt as one list rather than
+        # shifting the caller's with insert(0)
         if messages and messages[0].role == MessageRole.SYSTEM:
-            original_system = messages[0].content
-            messages[0] = ChatMessage(
+            sys_msg = ChatMessage.model_construct(
                 role=MessageRole.SYSTEM,
-                content=original_system + "\n\n" + agentic_prompt,
+                content=messages[0].content + "\n\n" + agentic_prompt,
             )
+            messages = [sys_msg, *messages[1:]]
         else:
-            messages.insert(0, ChatMessage(role=MessageRole.SYSTEM, content=agentic_prompt))
+            messages = [
+                ChatMessage.model_construct(role=MessageRole.SYSTEM, content=agentic_prompt),
+                *messages,
+            ]
 
         # Add a guidance message to start execution
-        guidance = ChatMessage(
+        guidance = ChatMessage.model_construct(
             role=MessageRole.USER,
             content=(
                 f"Execute the plan step by step. You are on step 1 of {total_steps}. "
@@ -435,9 +459,11 @@ class AgenticEngine:
                 )
                 break
 
-            # LLM call — may produce tool calls or final text
+            # LLM call — may produce tool calls or final text. Tool calls
+            # arrive on a single chunk, so remember that chunk rather than
+            # extending a list per iteration.
             full_content = ""
-            current_tool_calls: List[ToolCall] = []
+            tool_call_chunk = None
             last_usage = None
 
             async for chunk in self.provider.stream(
@@ -449,10 +475,14 @@ class AgenticEngine:
             ):
                 full_content += chunk.content
                 if chunk.tool_calls:
-                    current_tool_calls.extend(chunk.tool_calls)
+                    tool_call_chunk = chunk
                 if chunk.usage:
                     last_usage = chunk.usage
 
+            current_tool_calls: List[ToolCall] = (
+                list(tool_call_chunk.tool_calls) if tool_call_chunk else []
+            )
+
             # Fallback parsing for models that output raw JSON
             if not current_tool_calls and tools:
                 parsed = self.provider._try_parse_tool_calls(full_content)
@@ -471,14 +501,15 @@ class AgenticEngine:
                 # Stream final answer
                 yield StreamChunk(content=full_content, done=True, usage=last_usage)
                 logger.info(
-                    f"Phase 5.5: Completed in {round_num + 1} rounds, "
-                    f"{time.time() - start_time:.1f}s"
+                    "Phase 5.5: Completed in %d rounds, %.1fs",
+                    round_num + 1,
+                    time.time() - start_time,
                 )
                 return
 
             # --- Has tool calls → execute them ---
             # Append assistant message
-            assistant_msg = ChatMessage(
+            assistant_msg = ChatMessage.model_construct(
                 role=MessageRole.ASSISTANT,
                 content=full_content,
                 tool_calls=current_tool_calls,
@@ -504,17 +535,20 @@ class AgenticEngine:
                     result = await tool.run(**tool_args)
                     tool_duration = time.time() - tool_start
                     logger.info(
-                        f"Phase 5.5 round {round_num + 1}: "
-                        f"{tool_name} completed in {tool_duration:.2f}s"
+                        "Phase 5.5 round %d: %s completed in %.2fs",
+                        round_num + 1,
+                        tool_name,
+                        tool_duration,
                     )
                 except Exception as e:
                     logger.error(f"Phase 5.5: Tool {tool_name} failed: {e}")
                     result = f"Error executing {tool_name}: {e}"
 
-                # Append tool result
-                tool_msg = ChatMessage(
+                # Append tool result (tools already return strings; only
+                # error fallbacks and exotic tools need the str() pass)
+                tool_msg = ChatMessage.model_construct(
                     role=MessageRole.TOOL,
-                    content=str(result),
+                    content=result if isinstance(result, str) else str(result),
                     tool_call_id=tool_call.id,
                 )
                 messages.append(tool_msg)
@@ -536,7 +570,7 @@ class AgenticEngine:
 
             # Guide LLM to next step
             if current_step < total_steps:
-                next_guidance = ChatMessage(
+                next_guidance = ChatMessage.model_construct(
                     role=MessageRole.USER,
                     content=(
                         f"Good. Now proceed to step {current_step + 1} of {total_steps}: "
@@ -548,7 +582,7 @@ class AgenticEngine:
                 messages.append(next_guidance)
             else:
                 # All steps done — ask for synthesis
-                synthesis_guidance = ChatMessage(
+                synthesis_guidance = ChatMessage.model_construct(
                     role=MessageRole.USER,
                     content=(
                         "All planned steps are complete. Now synthesize ALL the information "
@@ -580,8 +614,9 @@ class AgenticEngine:
 
         yield StreamChunk(content=synthesis_content, done=True, usage=last_usage)
         logger.info(
-            f"Phase 5.5: Force-synthesized after {round_num + 1} rounds, "
-            f"{time.time() - start_time:.1f}s"
+            "Phase 5.5: Force-synthesized after %d rounds, %.1fs",
+            round_num + 1,
+            time.time() - start_time,
         )
 
     # ------------------------------------------------------------------ #
@@ -1,4 +1,6 @@
+import base64
 import logging
+import struct
 from typing import List, Optional
 
 import httpx
@@ -8,6 +10,22 @@ from chatbot_ai_system.config import get_settings
 logger = logging.getLogger(__name__)
 
 
+def _pack_f16(embedding: List[float]) -> str:
+    """Pack an embedding into base64 float16 for the Redis cache.
+
+    Half precision loses ~3 decimal digits, which is noise for cosine
+    similarity, and halves the cached payload vs float32 (4x vs the JSON
+    text the cache used to store).
+    """
+    return base64.b64encode(struct.pack(f"{len(embedding)}e", *embedding)).decode()
+
+
+def _unpack_f16(blob: str) -> List[float]:
+    """Decode a base64 float16 cache entry back to a list of floats."""
+    data = base64.b64decode(blob)
+    return list(struct.unpack(f"{len(data) // 2}e", data))
+
+
 class EmbeddingService:
     """
     Service for generating text embeddings using Ollama.
@@ -29,15 +47,15 @@ class EmbeddingService:
 
         from chatbot_ai_system.database.redis import redis_client
 
-        # Create hash for text
+        # Create hash for text (f16 prefix: entries are packed float16)
         text_hash = hashlib.md5(text.encode()).hexdigest()
-        cache_key = f"embedding:{text_hash}"
+        cache_key = f"embedding:f16:{text_hash}"
 
         # Check cache
         cached_embedding = await redis_client.get(cache_key)
         if cached_embedding:
             logger.info("Using cached embedding")
-            return cached_embedding
+            return _unpack_f16(cached_embedding)
 
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
@@ -51,7 +69,7 @@ class EmbeddingService:
 
                     if embedding:
                         # Cache embedding (24 hour TTL)
-                        await redis_client.set(cache_key, embedding, ttl=86400)
+                        await redis_client.set(cache_key, _pack_f16(embedding), ttl=86400)
 
                     return embedding
                 else:
@@ -8,6 +8,7 @@ Handles image, audio, and video processing for multimodal chat.
 - Storage: save files to local media/ directory
 """
 
+import asyncio
 import base64
 import io
 import logging
@@ -49,9 +50,16 @@ class MediaPipeline:
         """
         Process an image: validate, resize, encode to base64.
 
+        PIL decode/resize and base64 are CPU-bound, so the work runs in a
+        worker thread — a multi-MB upload must not stall the event loop
+        (and every concurrent voice stream with it).
+
         Returns:
             dict with keys: base64_data, width, height, file_path, file_size_bytes
         """
+        return await asyncio.to_thread(self._process_image_sync, file_bytes, filename)
+
+    def _process_image_sync(self, file_bytes: bytes, filename: str) -> dict:
         try:
             img = Image.open(io.BytesIO(file_bytes))
             original_width, original_height = img.size
@@ -88,6 +96,38 @@ class MediaPipeline:
             logger.error(f"Image processing failed: {e}")
             raise ValueError(f"Failed to process image: {e}")
 
+    async def load_image_base64(self, file_path: str) -> Optional[str]:
+        """
+        Re-encode a stored image for the vision model.
+
+        Upload responses skip inline base64 for large images; when a chat
+        turn references one by its stored path, the bytes are read back and
+        pushed through the same resize/JPEG/base64 path as inline uploads.
+        Only paths inside the images storage dir are honored — the path
+        arrives from the client.
+        """
+        images_root = (self.storage_path / "images").resolve()
+        path = Path(file_path).resolve()
+        if images_root not in path.parents or not path.is_file():
+            logger.warning(f"Refusing to read image outside media storage: {file_path}")
+            return None
+
+        try:
+            return await asyncio.to_thread(self._load_image_sync, path)
+        except Exception as e:
+            logger.error(f"Failed to load stored image {file_path}: {e}")
+            return None
+
+    def _load_image_sync(self, path: Path) -> str:
+        img = Image.open(path)
+        if max(img.size) > MAX_IMAGE_DIM:
+            img.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), Image.LANCZOS)
+        if img.mode == "RGBA":
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=85)
+        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
     # ─── Audio Processing ───────────────────────────────────────────
 
     async def process_audio(self, file_bytes: bytes, filename: str, mime_type: str) -> dict:
@@ -98,20 +138,10 @@ class MediaPipeline:
             dict with keys: transcription, duration_seconds, file_path, file_size_bytes
         """
         try:
-            # Save original file
-            file_path = self._save_file(file_bytes, filename, "audio")
-
-            # Convert to WAV for Whisper
-            audio = AudioSegment.from_file(io.BytesIO(file_bytes))
-            duration_seconds = len(audio) / 1000.0
-
-            # Convert to 16kHz mono WAV for STT
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            wav_buffer = io.BytesIO()
-            audio.export(wav_buffer, format="wav")
-            wav_bytes = wav_buffer.getvalue()
-
-            # Run STT
+            # Decode/resample off the event loop, then run STT
+            file_path, duration_seconds, wav_bytes = await asyncio.to_thread(
+                self._prepare_audio_sync, file_bytes, filename
+            )
             transcription = await self._transcribe_audio(wav_bytes)
 
             return {
@@ -125,6 +155,26 @@ class MediaPipeline:
             logger.error(f"Audio processing failed: {e}")
             raise ValueError(f"Failed to process audio: {e}")
 
+    def _prepare_audio_sync(self, file_bytes: bytes, filename: str) -> tuple:
+        """Save the original file and convert to 16kHz mono WAV (CPU-bound)."""
+        file_path = self._save_file(file_bytes, filename, "audio")
+
+        audio = AudioSegment.from_file(io.BytesIO(file_bytes))
+        duration_seconds = len(audio) / 1000.0
+
+        audio = audio.set_frame_rate(16000).set_channels(1)
+        wav_buffer = io.BytesIO()
+        audio.export(wav_buffer, format="wav")
+        return file_path, duration_seconds, wav_buffer.getvalue()
+
+    def _to_wav_sync(self, file_bytes: bytes) -> bytes:
+        """Extract a 16kHz mono WAV track from a media container (CPU-bound)."""
+        audio = AudioSegment.from_file(io.BytesIO(file_bytes))
+        audio = audio.set_frame_rate(16000).set_channels(1)
+        wav_buffer = io.BytesIO()
+        audio.export(wav_buffer, format="wav")
+        return wav_buffer.getvalue()
+
     # ─── Video Processing ───────────────────────────────────────────
 
     async def process_video(self, file_bytes: bytes, filename: str, mime_type: str) -> dict:
@@ -136,62 +186,19 @@ class MediaPipeline:
                            duration_seconds, file_path, file_size_bytes
         """
         try:
-            import tempfile
-
-            import cv2
-
             # Save original file
             file_path = self._save_file(file_bytes, filename, "video")
 
-            # Write to temp file for OpenCV
-            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-                tmp.write(file_bytes)
-                tmp_path = tmp.name
-
-            try:
-                cap = cv2.VideoCapture(tmp_path)
-                fps = cap.get(cv2.CAP_PROP_FPS) or 30
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                duration_seconds = total_frames / fps
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-                # Extract keyframes at intervals
-                keyframes = []
-                frame_interval = int(fps * KEYFRAME_INTERVAL_SEC)
-                frame_idx = 0
-
-                while cap.isOpened() and len(keyframes) < MAX_VIDEO_KEYFRAMES:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-
-                    # Resize frame
-                    h, w = frame.shape[:2]
-                    if max(h, w) > MAX_IMAGE_DIM:
-                        scale = MAX_IMAGE_DIM / max(h, w)
-                        frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
-
-                    # Encode to base64
-                    _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                    b64 = base64.b64encode(buffer.tobytes()).decode("utf-8")
-                    keyframes.append(b64)
-
-                    frame_idx += frame_interval
-
-                cap.release()
-            finally:
-                os.unlink(tmp_path)
+            # Keyframe extraction is pure OpenCV CPU work — off the loop
+            keyframes, duration_seconds, width, height = await asyncio.to_thread(
+                self._extract_keyframes_sync, file_bytes
+            )
 
             # Extract and transcribe audio track
             transcription = None
             try:
-                audio = AudioSegment.from_file(io.BytesIO(file_bytes))
-                audio = audio.set_frame_rate(16000).set_channels(1)
-                wav_buffer = io.BytesIO()
-                audio.export(wav_buffer, format="wav")
-                transcription = await self._transcribe_audio(wav_buffer.getvalue())
+                wav_bytes = await asyncio.to_thread(self._to_wav_sync, file_bytes)
+                transcription = await self._transcribe_audio(wav_bytes)
             except Exception as e:
                 logger.warning(f"Could not extract audio from video: {e}")
 
@@ -209,10 +216,62 @@ class MediaPipeline:
             logger.error(f"Video processing failed: {e}")
             raise ValueError(f"Failed to process video: {e}")
 
+    def _extract_keyframes_sync(self, file_bytes: bytes) -> tuple:
+        """Extract resized, base64-encoded keyframes with OpenCV (CPU-bound)."""
+        import tempfile
+
+        import cv2
+
+        # Write to temp file for OpenCV
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+            tmp.write(file_bytes)
+            tmp_path = tmp.name
+
+        try:
+            cap = cv2.VideoCapture(tmp_path)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            duration_seconds = total_frames / fps
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            # Extract keyframes at intervals
+            keyframes = []
+            frame_interval = int(fps * KEYFRAME_INTERVAL_SEC)
+            frame_idx = 0
+
+            while cap.isOpened() and len(keyframes) < MAX_VIDEO_KEYFRAMES:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                # Resize frame
+                h, w = frame.shape[:2]
+                if max(h, w) > MAX_IMAGE_DIM:
+                    scale = MAX_IMAGE_DIM / max(h, w)
+                    frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+
+                # Encode to base64
+                _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+                b64 = base64.b64encode(buffer.tobytes()).decode("utf-8")
+                keyframes.append(b64)
+
+                frame_idx += frame_interval
+
+            cap.release()
+        finally:
+            os.unlink(tmp_path)
+
+        return keyframes, duration_seconds, width, height
+
     # ─── STT (Whisper) ──────────────────────────────────────────────
 
     async def _transcribe_audio(self, wav_bytes: bytes) -> str:
-        """Transcribe WAV audio using faster-whisper."""
+        """Transcribe WAV audio using faster-whisper (runs in a worker thread)."""
+        return await asyncio.to_thread(self._transcribe_audio_sync, wav_bytes)
+
+    def _transcribe_audio_sync(self, wav_bytes: bytes) -> str:
         import tempfile
 
         from faster_whisper import WhisperModel
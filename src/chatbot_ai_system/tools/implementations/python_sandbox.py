@@ -1,5 +1,6 @@
 """Local Python Sandbox tool implementation."""
 
+import asyncio
 import logging
 import os
 import subprocess
@@ -41,29 +42,37 @@ class LocalPythonSandbox(MCPTool):
             logger.warning("Code contains potential system command execution.")
 
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as tmp:
-                tmp.write(code)
-                tmp_path = tmp.name
+            # subprocess.run blocks until the script finishes (up to `timeout`
+            # seconds); run it in a worker thread so it doesn't stall the
+            # event loop or other concurrent tool calls.
+            return await asyncio.to_thread(self._run_sync, code, timeout)
 
-            # Run the script
-            # Use specific python executable or sys.executable
-            result = subprocess.run(
-                [sys.executable, tmp_path], capture_output=True, text=True, timeout=timeout
-            )
+        except subprocess.TimeoutExpired:
+            return f"Error: Execution timed out after {timeout} seconds."
+        except Exception as e:
+            return f"System Error: {str(e)}"
 
-            output = result.stdout
-            error = result.stderr
+    @staticmethod
+    def _run_sync(code: str, timeout: int) -> str:
+        """Blocking script execution, executed off the event loop."""
+        # Create a temporary file
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as tmp:
+            tmp.write(code)
+            tmp_path = tmp.name
 
-            # Clean up
-            os.remove(tmp_path)
+        # Run the script
+        # Use specific python executable or sys.executable
+        result = subprocess.run(
+            [sys.executable, tmp_path], capture_output=True, text=True, timeout=timeout
+        )
 
-            if result.returncode != 0:
-                return f"Error (Exit Code {result.returncode}):\n{error}\nOutput:\n{output}"
+        output = result.stdout
+        error = result.stderr
 
-            return output if output.strip() else "Script executed successfully (no output)."
+        # Clean up
+        os.remove(tmp_path)
 
-        except subprocess.TimeoutExpired:
-            return f"Error: Execution timed out after {timeout} seconds."
-        except Exception as e:
-            return f"System Error: {str(e)}"
+        if result.returncode != 0:
+            return f"Error (Exit Code {result.returncode}):\n{error}\nOutput:\n{output}"
+
+        return output if output.strip() else "Script executed successfully (no output)."
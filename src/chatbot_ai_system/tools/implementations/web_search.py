@@ -1,5 +1,6 @@
 """DuckDuckGo Web Search tool implementation."""
 
+import asyncio
 import logging
 
 # Try importing, but fail gracefully if not installed so app doesn't crash
@@ -41,13 +42,10 @@ class DuckDuckGoSearchTool(MCPTool):
             return "Error: duckduckgo-search library is not installed."
 
         try:
-            results = []
-            with DDGS() as ddgs:
-                # 'text' method replaces 'answers' in newer versions
-                # ddgs.text() returns an iterator
-                ddgs_gen = ddgs.text(query, max_results=max_results)
-                for r in ddgs_gen:
-                    results.append(r)
+            # DDGS is a synchronous HTTP client; run it in a worker thread so
+            # the search doesn't block the event loop (and other concurrent
+            # tool calls) while waiting on the network.
+            results = await asyncio.to_thread(self._search_sync, query, max_results)
 
             if not results:
                 return "No results found."
@@ -65,3 +63,15 @@ class DuckDuckGoSearchTool(MCPTool):
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {e}")
             return f"Search failed: {str(e)}"
+
+    @staticmethod
+    def _search_sync(query: str, max_results: int) -> list:
+        """Blocking DDGS call, executed off the event loop."""
+        results = []
+        with DDGS() as ddgs:
+            # 'text' method replaces 'answers' in newer versions
+            # ddgs.text() returns an iterator
+            ddgs_gen = ddgs.text(query, max_results=max_results)
+            for r in ddgs_gen:
+                results.append(r)
+        return results
@@ -1,9 +1,13 @@
+import asyncio
 from typing import Any, Dict, List, Optional
 
 from .base import MCPTool
 from .implementations.python_sandbox import LocalPythonSandbox
 from .implementations.web_search import DuckDuckGoSearchTool
 
+# Bound on memoized query→tools results; evicted FIFO beyond this
+_QUERY_CACHE_MAX = 256
+
 try:
     from .mcp_client import MCPClient
 except ImportError:
@@ -43,6 +47,13 @@ class ToolRegistry:
         self._tools: Dict[str, MCPTool] = {}
         self._mcp_clients: List["MCPClient"] = []
         self._remote_tools_cache: Dict[str, RemoteMCPTool] = {}
+        # Serialized Ollama-format schemas, memoized per tool name. The
+        # catalog is rebuilt on every chat turn otherwise; invalidated when
+        # tools are registered or remote tools refreshed.
+        self._format_cache: Dict[str, Dict[str, Any]] = {}
+        # Filtered-tools results memoized by normalized query — the walk
+        # over categories and keywords is identical for repeated queries.
+        self._query_cache: Dict[str, List[Dict[str, Any]]] = {}
 
         # Phase 6.5: Register Free Tools automatically
         self.register(DuckDuckGoSearchTool())
@@ -53,11 +64,28 @@ class ToolRegistry:
         if tool.name in self._tools:
             raise ValueError(f"Tool {tool.name} already registered")
         self._tools[tool.name] = tool
+        self._format_cache.pop(tool.name, None)
+        self._query_cache.clear()
+
+    def _fmt(self, tool: MCPTool) -> Dict[str, Any]:
+        """Return the tool's Ollama-format schema, memoized by name."""
+        fmt = self._format_cache.get(tool.name)
+        if fmt is None:
+            fmt = self._format_cache[tool.name] = tool.to_ollama_format()
+        return fmt
+
+    def local_tool_formats(self) -> List[Dict[str, Any]]:
+        """Serialized schemas for all local tools (cached)."""
+        return [self._fmt(t) for t in self._tools.values()]
 
     def register_mcp_client(self, client: "MCPClient"):
         """Register an MCP client."""
         self._mcp_clients.append(client)
 
+    def register_many(self, clients: List["MCPClient"]):
+        """Register several MCP clients at once."""
+        self._mcp_clients.extend(clients)
+
     def get_tool(self, name: str) -> MCPTool:
         """Get a tool by name (checks local first, then cached remote)."""
         if name in self._tools:
@@ -73,27 +101,35 @@ class ToolRegistry:
         return list(self._tools.values()) + list(self._remote_tools_cache.values())
 
     async def refresh_remote_tools(self):
-        """Refresh tools from all registered MCP clients."""
-        self._remote_tools_cache.clear()
+        """Refresh tools from all registered MCP clients.
 
-        for client in self._mcp_clients:
-            try:
-                tool_list = await client.list_tools()
-                for tool_def in tool_list:
-                    # tool_def is {'type': 'function', 'function': {'name': ..., ...}}
-                    func = tool_def.get("function", {})
-                    name = func.get("name")
-                    if name:
-                        remote_tool = RemoteMCPTool(
-                            client=client,
-                            name=name,
-                            description=func.get("description", ""),
-                            schema=func.get("parameters", {}),
-                        )
-                        self._remote_tools_cache[name] = remote_tool
-            except Exception as e:
+        Each client spawn/list round trip can take hundreds of ms, so they
+        run concurrently — refresh time is max(client_i) not sum(client_i).
+        """
+        self._remote_tools_cache.clear()
+        self._format_cache.clear()
+        self._query_cache.clear()
+
+        results = await asyncio.gather(
+            *(client.list_tools() for client in self._mcp_clients), return_exceptions=True
+        )
+        for client, tool_list in zip(self._mcp_clients, results):
+            if isinstance(tool_list, BaseException):
                 # Log error but continue
-                print(f"Error fetching tools from client: {e}")
+                print(f"Error fetching tools from client: {tool_list}")
+                continue
+            for tool_def in tool_list:
+                # tool_def is {'type': 'function', 'function': {'name': ..., ...}}
+                func = tool_def.get("function", {})
+                name = func.get("name")
+                if name:
+                    remote_tool = RemoteMCPTool(
+                        client=client,
+                        name=name,
+                        description=func.get("description", ""),
+                        schema=func.get("parameters", {}),
+                    )
+                    self._remote_tools_cache[name] = remote_tool
 
     def get_categories(self) -> List[str]:
         """Get list of available tool categories (MCP client names + GENERAL)."""
@@ -110,14 +146,12 @@ class ToolRegistry:
 
         # General tools (local)
         if category == "GENERAL":
-            for tool in self._tools.values():
-                tools.append(tool.to_ollama_format())
-            return tools
+            return self.local_tool_formats()
 
         # MCP tools
         for name, tool in self._remote_tools_cache.items():
             if isinstance(tool, RemoteMCPTool) and tool.client.name.upper() == category:
-                tools.append(tool.to_ollama_format())
+                tools.append(self._fmt(tool))
 
         return tools
 
@@ -128,7 +162,12 @@ class ToolRegistry:
         if not query:
             return []
 
-        q = query.lower()
+        q = " ".join(query.lower().split())
+        cached = self._query_cache.get(q)
+        if cached is not None:
+            # Copy: callers append local tools to the returned list
+            return list(cached)
+
         filtered = []
         seen = set()
 
@@ -165,19 +204,19 @@ class ToolRegistry:
 
             # Simple keyword heuristic
             if any(k in q for k in ["read", "view", "cat", "show"]) and "read" in name:
-                keyword_matches.append(tool.to_ollama_format())
+                keyword_matches.append(self._fmt(tool))
             elif any(k in q for k in ["write", "create", "save"]) and "write" in name:
-                keyword_matches.append(tool.to_ollama_format())
+                keyword_matches.append(self._fmt(tool))
             elif any(k in q for k in ["search", "find", "grep"]) and "search" in name:
-                keyword_matches.append(tool.to_ollama_format())
+                keyword_matches.append(self._fmt(tool))
             elif any(k in q for k in ["list", "dir", "ls"]) and (
                 "list" in name or "ls" in name or "dir" in name
             ):
-                keyword_matches.append(tool.to_ollama_format())
+                keyword_matches.append(self._fmt(tool))
             elif (
                 any(k in q for k in ["git", "status", "diff", "branch", "commit"]) and "git" in name
             ):
-                keyword_matches.append(tool.to_ollama_format())
+                keyword_matches.append(self._fmt(tool))
 
         # Combine: Priority (Category match) > Keyword match
         for tool in priority_tools + keyword_matches:
@@ -186,4 +225,8 @@ class ToolRegistry:
                 filtered.append(tool)
                 seen.add(name)
 
-        return filtered[:MAX_TOOLS]
+        result = filtered[:MAX_TOOLS]
+        if len(self._query_cache) >= _QUERY_CACHE_MAX:
+            self._query_cache.pop(next(iter(self._query_cache)))
+        self._query_cache[q] = result
+        return list(result)